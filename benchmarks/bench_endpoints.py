@@ -0,0 +1,298 @@
+"""Latency and throughput of every route across dataset sizes.
+
+Usage:
+    python benchmarks/bench_endpoints.py run --sizes 1000,10000 --out bench.json
+    python benchmarks/bench_endpoints.py run --modes client,gunicorn --sizes 1000,10000,100000,1000000
+    python benchmarks/bench_endpoints.py compare baseline.json bench.json --threshold 0.10
+
+For each size a temporary data directory is seeded with that many orders and
+reviews, then each route is timed in a fresh process, through the Flask test
+client (``client``) and/or a local gunicorn (``gunicorn``). Results are
+written as JSON; ``compare`` reports routes that got slower and exits with
+status 1 when it finds any.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+from datasets import seed_data_dir, synthetic_orders, synthetic_reviews  # noqa: E402
+from replay import build_opener, percentile, send  # noqa: E402
+
+ORDER_BODY = {'fullName': 'Bench Customer', 'phoneNumber': '09123456789', 'facebook': 'bench',
+              'pickupDate': '2026-12-01', 'quantity': 2, 'topping': 'ube'}
+REVIEW_BODY = {'name': 'Bench', 'email': 'bench@example.com', 'productRating': 5, 'serviceRating': 4,
+               'comment': 'Benchmark review'}
+
+# (method, path, body, needs admin session)
+ROUTES = [
+    ('GET', '/api/health', None, False),
+    ('GET', '/api/orders', None, False),
+    ('POST', '/api/orders', ORDER_BODY, False),
+    ('GET', '/api/reviews', None, False),
+    ('POST', '/api/reviews', REVIEW_BODY, False),
+    ('GET', '/api/pricing', None, False),
+    ('GET', '/api/versions', None, False),
+    ('POST', '/api/calculate-price', {'quantity': 3, 'topping': 'ube'}, False),
+    ('GET', '/index.html', None, False),
+    ('GET', '/styles/style.css', None, False),
+    ('GET', '/scripts/script.js', None, False),
+    ('GET', '/api/dashboard/orders', None, True),
+    ('GET', '/api/dashboard/reviews', None, True),
+    ('GET', '/api/dashboard/archive', None, True),
+    ('GET', '/api/dashboard/analytics?bucket=week&groupBy=topping', None, True),
+]
+
+# Keep the seeded data hot and the limiter out of the way while benchmarking
+SERVER_ENV = {'RATE_LIMIT': str(10 ** 9), 'ORDER_ARCHIVE_DAYS': str(365 * 100)}
+
+
+def route_name(method, path):
+    return f"{method} {path}"
+
+
+def summarize(latencies, errors, wall):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    return {
+        'requests': count,
+        'errors': errors,
+        'meanMs': round(sum(latencies) / count * 1000, 3) if count else 0.0,
+        'p50Ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95Ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99Ms': round(percentile(latencies, 99) * 1000, 3),
+        'throughput': round(count / wall, 2) if wall else 0.0
+    }
+
+
+def timed_loop(call, max_requests, budget, concurrency=1):
+    """Call ``call`` from ``concurrency`` threads until ``max_requests`` or ``budget`` seconds"""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + budget
+    issued = [0]
+
+    def worker():
+        while True:
+            with lock:
+                # Always complete at least one request per route, even when it exceeds the budget
+                if issued[0] >= max_requests or (issued[0] and time.perf_counter() > deadline):
+                    return
+                issued[0] += 1
+            ok, elapsed = call()
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors[0] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return summarize(latencies, errors[0], time.perf_counter() - started)
+
+
+def bench_client(args):
+    """Child process: time every route through the Flask test client"""
+    sys.path.insert(0, os.path.join(REPO_ROOT, 'server'))
+    import server
+
+    client = server.app.test_client()
+    with client.session_transaction() as session:
+        session['admin_id'] = 'admin'
+
+    results = {}
+    for method, path, body, _ in ROUTES:
+        def call(method=method, path=path, body=body):
+            started = time.perf_counter()
+            resp = client.open(path, method=method, json=body)
+            resp.get_data()
+            return resp.status_code < 400, time.perf_counter() - started
+        results[route_name(method, path)] = timed_loop(call, args.max_requests, args.route_seconds)
+    print(json.dumps(results))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def bench_gunicorn(data_dir, args):
+    port = free_port()
+    target = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, DATA_DIR=data_dir, **SERVER_ENV)
+    proc = subprocess.Popen(
+        ['gunicorn', '-w', str(args.workers), '--threads', str(args.threads), '--timeout', '600',
+         '-b', f"127.0.0.1:{port}", 'server.server:app'],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + args.startup_timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"{target}/api/health", timeout=2).read()
+                break
+            except OSError:
+                if proc.poll() is not None or time.time() > deadline:
+                    raise RuntimeError('gunicorn did not start')
+                time.sleep(0.5)
+
+        opener = build_opener(target, os.environ.get('ADMIN_USERNAME', 'admin'),
+                              os.environ.get('ADMIN_PASSWORD', 'admin123'))
+        results = {}
+        for method, path, body, _ in ROUTES:
+            entry = {'method': method, 'path': path, 'body': body}
+
+            def call(entry=entry):
+                status, elapsed = send(opener, target, entry, timeout=600)
+                return 0 < status < 400, elapsed
+            results[route_name(method, path)] = timed_loop(call, args.max_requests, args.route_seconds,
+                                                           args.concurrency)
+        return results
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = args.modes.split(',')
+    report = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'commit': _git_commit(),
+            'settings': {key: getattr(args, key) for key in
+                         ('max_requests', 'route_seconds', 'concurrency', 'workers', 'threads')}
+        },
+        'results': []
+    }
+
+    for size in sizes:
+        for mode in modes:
+            tmp = tempfile.mkdtemp(prefix=f"gle-bench-{size}-")
+            try:
+                # Recent timestamps so nothing is archived; reseeded per mode since POSTs append
+                start = datetime.now() - timedelta(days=60)
+                seed_data_dir(tmp, synthetic_orders(size, start=start, spacing=max(1, 60 * 86400 // size)),
+                              synthetic_reviews(size))
+                print(f"[{mode}] {size:,} records ...", file=sys.stderr)
+                if mode == 'client':
+                    env = dict(os.environ, DATA_DIR=tmp, **SERVER_ENV)
+                    out = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), '_client',
+                         '--max-requests', str(args.max_requests), '--route-seconds', str(args.route_seconds)],
+                        cwd=REPO_ROOT, env=env, check=True, capture_output=True, text=True).stdout
+                    routes = json.loads(out.strip().splitlines()[-1])
+                elif mode == 'gunicorn':
+                    routes = bench_gunicorn(tmp, args)
+                else:
+                    raise SystemExit(f"unknown mode: {mode}")
+            finally:
+                shutil.rmtree(tmp, ignore_errors=True)
+
+            for route, stats in routes.items():
+                report['results'].append(dict({'size': size, 'mode': mode, 'route': route}, **stats))
+                print(f"  {route:<58}{stats['p50Ms']:>10.2f} ms p50{stats['throughput']:>10.1f} req/s",
+                      file=sys.stderr)
+
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.out}", file=sys.stderr)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    def key(result):
+        return (result['size'], result['mode'], result['route'])
+
+    base_by_key = {key(r): r for r in baseline['results']}
+    regressions = []
+    print(f"{'size':>9} {'mode':<9}{'route':<58}{'p50 ms':>16}{'p95 ms':>16}{'req/s':>16}")
+    for result in current['results']:
+        base = base_by_key.get(key(result))
+        if base is None:
+            continue
+        flags = []
+        for metric in ('p50Ms', 'p95Ms'):
+            delta = result[metric] - base[metric]
+            if delta > args.min_delta_ms and result[metric] > base[metric] * (1 + args.threshold):
+                flags.append(metric)
+        if base['throughput'] and result['throughput'] < base['throughput'] * (1 - args.threshold):
+            flags.append('throughput')
+        marker = '  <-- ' + ', '.join(flags) if flags else ''
+        print(f"{result['size']:>9} {result['mode']:<9}{result['route']:<58}"
+              f"{base['p50Ms']:>7.2f}->{result['p50Ms']:<7.2f}{base['p95Ms']:>7.2f}->{result['p95Ms']:<7.2f}"
+              f"{base['throughput']:>7.0f}->{result['throughput']:<7.0f}{marker}")
+        if flags:
+            regressions.append((key(result), flags))
+
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help='seed datasets and time every route')
+    run_parser.add_argument('--sizes', default='1000,10000,100000,1000000')
+    run_parser.add_argument('--modes', default='client,gunicorn', help='client, gunicorn or both')
+    run_parser.add_argument('--max-requests', type=int, default=200, help='per route')
+    run_parser.add_argument('--route-seconds', type=float, default=5.0, help='time budget per route')
+    run_parser.add_argument('--concurrency', type=int, default=8, help='client threads in gunicorn mode')
+    run_parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    run_parser.add_argument('--threads', type=int, default=4, help='gunicorn threads per worker')
+    run_parser.add_argument('--startup-timeout', type=float, default=600.0)
+    run_parser.add_argument('--out', default='bench_results.json')
+
+    client_parser = sub.add_parser('_client')
+    client_parser.add_argument('--max-requests', type=int, default=200)
+    client_parser.add_argument('--route-seconds', type=float, default=5.0)
+
+    compare_parser = sub.add_parser('compare', help='flag regressions between two result files')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10, help='relative change to flag')
+    compare_parser.add_argument('--min-delta-ms', type=float, default=0.5,
+                                help='ignore latency changes smaller than this')
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    elif args.command == '_client':
+        bench_client(args)
+    else:
+        return compare(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
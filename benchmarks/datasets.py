@@ -0,0 +1,56 @@
+"""Synthetic orders and reviews shaped like the records in server/data."""
+import json
+import os
+import random
+from datetime import datetime, timedelta
+
+TOPPINGS = {'none': 0.00, 'ube': 3.00, 'crashed_graham': 2.00}
+BASE_PRICE = 25.00
+
+
+def synthetic_orders(count, seed=42, start=None, spacing=30):
+    """``count`` orders created ``spacing`` seconds apart from ``start``"""
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1)
+    for i in range(count):
+        created = start + timedelta(seconds=i * spacing, microseconds=rng.randrange(1000000))
+        topping = rng.choice(list(TOPPINGS))
+        qty = rng.randint(1, 10)
+        unit = BASE_PRICE + TOPPINGS[topping]
+        yield {
+            'fullName': f"Customer {rng.randrange(count)}",
+            'phoneNumber': f"09{rng.randrange(10**9):09d}",
+            'facebook': f"fb.user{rng.randrange(count)}",
+            'pickupDate': (created + timedelta(days=rng.randint(1, 7))).strftime('%Y-%m-%d'),
+            'quantity': qty,
+            'topping': topping,
+            'unitPrice': unit,
+            'totalPrice': round(unit * qty, 2),
+            'id': int(created.timestamp() * 1000),
+            'createdAt': created.isoformat()
+        }
+
+
+def synthetic_reviews(count, seed=7):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        created = start + timedelta(minutes=i)
+        yield {
+            'name': f"Reviewer {i}",
+            'email': f"reviewer{i}@example.com",
+            'productRating': rng.randint(1, 5),
+            'serviceRating': rng.randint(1, 5),
+            'comment': 'Lovely cheesecake, would order again. ' * rng.randint(1, 5),
+            'id': int(created.timestamp() * 1000),
+            'date': created.strftime('%m/%d/%Y')
+        }
+
+
+def seed_data_dir(data_dir, orders, reviews):
+    """Write orders.json / reviews.json the way the server's write_* helpers do"""
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, 'orders.json'), 'w') as f:
+        json.dump(list(orders), f, indent=2)
+    with open(os.path.join(data_dir, 'reviews.json'), 'w') as f:
+        json.dump(list(reviews), f, indent=2)
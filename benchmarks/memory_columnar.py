@@ -0,0 +1,61 @@
+"""Compare the memory footprint of list-of-dicts orders with ColumnarOrderStore.
+
+Usage:
+    python benchmarks/memory_columnar.py [--count 1000000]
+
+Writes a synthetic orders file in the same shape as server/data/orders.json,
+loads it the way read_orders() does, then builds a ColumnarOrderStore from it.
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'server'))
+from columnar import ColumnarOrderStore  # noqa: E402
+from datasets import synthetic_orders  # noqa: E402
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'orders.json')
+        with open(path, 'w') as f:
+            json.dump(list(synthetic_orders(args.count)), f)
+
+        def read_orders():
+            with open(path, 'r') as f:
+                return json.load(f)
+
+        orders, dict_bytes, dict_secs = measure(read_orders)
+        del orders
+        # Load and convert inside the traced window so the strings the store keeps are counted;
+        # the intermediate dicts are freed before the measurement is taken
+        store, col_bytes, col_secs = measure(lambda: ColumnarOrderStore.from_orders(read_orders()))
+        assert len(store) == args.count
+
+    print(f"orders:            {args.count:,}")
+    print(f"list of dicts:     {dict_bytes / 2**20:8.1f} MiB  ({dict_bytes / args.count:6.1f} B/order, load {dict_secs:.2f}s)")
+    print(f"columnar store:    {col_bytes / 2**20:8.1f} MiB  ({col_bytes / args.count:6.1f} B/order, build {col_secs:.2f}s)")
+    print(f"ratio:             {dict_bytes / col_bytes:8.1f}x smaller")
+
+
+if __name__ == '__main__':
+    main()
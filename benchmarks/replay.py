@@ -0,0 +1,201 @@
+"""Replay captured API traffic against a running server and report latency.
+
+Usage:
+    TRAFFIC_CAPTURE=true python server/server.py          # capture into requests.jsonl
+    python benchmarks/replay.py --target http://127.0.0.1:3000 --speed 4 --workers 32
+
+Requests are issued in capture order on the captured schedule (scaled by
+``--speed``; ``--speed 0`` sends as fast as the workers allow). The report
+lists throughput, p50/p95/p99 latency and error rates per route. Dashboard
+routes are replayed after logging in with ``--admin-user`` / ``--admin-password``.
+DELETE requests and other dashboard writes (which clear all orders or reviews)
+are skipped unless ``--include-destructive`` is given.
+"""
+import argparse
+import http.cookiejar
+import json
+import math
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+
+def load_capture(path, limit=None):
+    entries = []
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if 'method' in entry and 'path' in entry:
+                entries.append(entry)
+    # Lines from several workers can land slightly out of order; the arrival time is authoritative
+    if all('ts' in entry for entry in entries):
+        entries.sort(key=lambda entry: entry['ts'])
+        offsets = [entry['ts'] - entries[0]['ts'] for entry in entries] if entries else []
+    else:
+        offsets, elapsed = [], 0.0
+        for entry in entries:
+            elapsed += entry.get('dt', 0.0)
+            offsets.append(elapsed)
+    pairs = list(zip(offsets, entries))
+    return pairs[:limit] if limit else pairs
+
+
+def is_destructive(entry):
+    """DELETE requests and writes to admin routes, e.g. clearing every order on the target"""
+    path = urllib.parse.urlsplit(entry['path']).path
+    return entry['method'] == 'DELETE' or (entry['method'] != 'GET' and path.startswith('/api/dashboard/'))
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def build_opener(target, admin_user, admin_password):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+    if admin_user:
+        data = json.dumps({'username': admin_user, 'password': admin_password or ''}).encode('utf-8')
+        login = urllib.request.Request(f"{target}/login", data=data, method='POST',
+                                       headers={'Content-Type': 'application/json'})
+        try:
+            opener.open(login, timeout=10).read()
+        except urllib.error.URLError as e:
+            print(f"warning: admin login failed ({e}); dashboard routes will return 401", file=sys.stderr)
+    return opener
+
+
+def send(opener, target, entry, timeout):
+    body = entry.get('body')
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(f"{target}{entry['path']}", data=data, method=entry['method'],
+                                 headers={'Content-Type': 'application/json'} if data is not None else {})
+    started = time.perf_counter()
+    try:
+        with opener.open(req, timeout=timeout) as resp:
+            resp.read()
+            status = resp.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0  # connection error / timeout
+    return status, time.perf_counter() - started
+
+
+def route_of(entry):
+    return f"{entry['method']} {urllib.parse.urlsplit(entry['path']).path}"
+
+
+def replay(pairs, target, speed, workers, timeout, opener):
+    results = []
+    results_lock = threading.Lock()
+
+    def run(entry):
+        status, elapsed = send(opener, target, entry, timeout)
+        with results_lock:
+            results.append((route_of(entry), status, elapsed))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for offset, entry in pairs:
+            if speed > 0:
+                delay = offset / speed - (time.perf_counter() - started)
+                if delay > 0:
+                    time.sleep(delay)
+            pool.submit(run, entry)
+    return results, time.perf_counter() - started
+
+
+def summarize(results, duration):
+    routes = {}
+    for route, status, elapsed in results:
+        routes.setdefault(route, []).append((status, elapsed))
+
+    def stats(samples):
+        latencies = sorted(elapsed * 1000 for _, elapsed in samples)
+        errors = sum(1 for status, _ in samples if status == 0 or status >= 500)
+        client_errors = sum(1 for status, _ in samples if 400 <= status < 500)
+        return {
+            'requests': len(samples),
+            'throughput': round(len(samples) / duration, 2) if duration else 0.0,
+            'p50Ms': round(percentile(latencies, 50), 2),
+            'p95Ms': round(percentile(latencies, 95), 2),
+            'p99Ms': round(percentile(latencies, 99), 2),
+            'errorRate': round(errors / len(samples), 4),
+            'clientErrorRate': round(client_errors / len(samples), 4),
+            'shed': sum(1 for status, _ in samples if status == 503)
+        }
+
+    return {
+        'durationSeconds': round(duration, 3),
+        'total': stats([(status, elapsed) for _, status, elapsed in results]) if results else None,
+        'routes': {route: stats(samples) for route, samples in sorted(routes.items())}
+    }
+
+
+def print_report(report):
+    header = f"{'route':<36}{'reqs':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'5xx/err':>9}{'4xx':>8}"
+    print(header)
+    print('-' * len(header))
+    rows = list(report['routes'].items())
+    if report['total']:
+        rows.append(('TOTAL', report['total']))
+    for route, s in rows:
+        print(f"{route:<36}{s['requests']:>8}{s['throughput']:>10.1f}{s['p50Ms']:>10.1f}{s['p95Ms']:>10.1f}"
+              f"{s['p99Ms']:>10.1f}{s['errorRate']:>9.2%}{s['clientErrorRate']:>8.2%}")
+    print(f"\nduration: {report['durationSeconds']}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--file', default='requests.jsonl', help='captured traffic (default: requests.jsonl)')
+    parser.add_argument('--target', default='http://127.0.0.1:3000')
+    parser.add_argument('--speed', type=float, default=1.0, help='time scale: 1 = as captured, 4 = 4x faster, 0 = no pauses')
+    parser.add_argument('--workers', type=int, default=16, help='concurrent client threads')
+    parser.add_argument('--limit', type=int, default=None, help='replay only the first N requests')
+    parser.add_argument('--timeout', type=float, default=10.0)
+    parser.add_argument('--admin-user')
+    parser.add_argument('--admin-password')
+    parser.add_argument('--json', dest='json_out', help='also write the report as JSON to this path')
+    parser.add_argument('--include-destructive', action='store_true',
+                        help='also replay DELETE requests and dashboard writes (wipes data on the target)')
+    args = parser.parse_args()
+
+    pairs = load_capture(args.file, args.limit)
+    if not args.include_destructive:
+        skipped = sum(1 for _, entry in pairs if is_destructive(entry))
+        pairs = [(offset, entry) for offset, entry in pairs if not is_destructive(entry)]
+        if skipped:
+            print(f"skipping {skipped} destructive requests (use --include-destructive to replay them)",
+                  file=sys.stderr)
+    if not pairs:
+        print(f"no captured requests in {args.file}", file=sys.stderr)
+        return 1
+
+    target = args.target.rstrip('/')
+    opener = build_opener(target, args.admin_user, args.admin_password)
+    print(f"replaying {len(pairs)} requests against {target} at {args.speed or 'max'}x with {args.workers} workers")
+    results, duration = replay(pairs, target, args.speed, args.workers, args.timeout, opener)
+    report = summarize(results, duration)
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,9 +14,12 @@
         load('shared/modal.html','site-modal'),
         load('shared/footer.html','site-footer')
     ]).then(()=>{
-        const s = document.createElement('script');
-        s.src = 'scripts/script.js';
-        s.defer = true;
-        document.body.appendChild(s);
+        // Offline order queue first; async=false keeps injected scripts running in order
+        ['scripts/order-queue.js', 'scripts/script.js'].forEach(src => {
+            const s = document.createElement('script');
+            s.src = src;
+            s.async = false;
+            document.body.appendChild(s);
+        });
     });
 })();
@@ -0,0 +1,120 @@
+// Offline order queue shared by the page (script.js) and the service worker (sw.js).
+// Orders that could not be sent are kept in IndexedDB under their Idempotency-Key and
+// flushed oldest first, as gzip-compressed bundles, to POST /api/orders/bulk.
+(function (scope) {
+    const DB_NAME = 'gle-offline';
+    const STORE_NAME = 'orderQueue';
+    const SYNC_TAG = 'flush-orders';
+    const BULK_URL = '/api/orders/bulk';
+    // Server default for BULK_MAX_ORDERS
+    const MAX_BUNDLE_ORDERS = 50;
+    // Older queued orders are dropped unsent: the pickup date has likely passed, and the server
+    // only dedupes against orders that are still in its hot store
+    const MAX_QUEUE_AGE = 30 * 24 * 3600 * 1000;
+
+    function openDb() {
+        return new Promise((resolve, reject) => {
+            const req = indexedDB.open(DB_NAME, 1);
+            req.onupgradeneeded = () => req.result.createObjectStore(STORE_NAME, { keyPath: 'key' });
+            req.onsuccess = () => resolve(req.result);
+            req.onerror = () => reject(req.error);
+        });
+    }
+
+    // Run fn(store) in one transaction; resolves with the result of the request fn returns, if any
+    function withStore(mode, fn) {
+        return openDb().then(db => new Promise((resolve, reject) => {
+            const tx = db.transaction(STORE_NAME, mode);
+            const req = fn(tx.objectStore(STORE_NAME));
+            tx.oncomplete = () => { db.close(); resolve(req ? req.result : undefined); };
+            tx.onerror = tx.onabort = () => { db.close(); reject(tx.error); };
+        }));
+    }
+
+    function add(key, order) {
+        return withStore('readwrite', store => store.put({ key, order, queuedAt: Date.now() }));
+    }
+
+    function count() {
+        return withStore('readonly', store => store.count());
+    }
+
+    function all() {
+        return withStore('readonly', store => store.getAll())
+            .then(items => items.sort((a, b) => a.queuedAt - b.queuedAt));
+    }
+
+    function remove(keys) {
+        return withStore('readwrite', store => { keys.forEach(key => store.delete(key)); });
+    }
+
+    async function encode(bundle) {
+        const json = JSON.stringify(bundle);
+        if (typeof CompressionStream === 'undefined') {
+            return { body: json, headers: { 'Content-Type': 'application/json' } };
+        }
+        const stream = new Blob([json]).stream().pipeThrough(new CompressionStream('gzip'));
+        return {
+            body: await new Response(stream).blob(),
+            headers: { 'Content-Type': 'application/json', 'Content-Encoding': 'gzip' }
+        };
+    }
+
+    // Retry-After of a response in milliseconds (delta-seconds or an HTTP date), or null
+    function retryAfter(res) {
+        const value = res.headers.get('Retry-After');
+        if (!value) return null;
+        const seconds = Number(value);
+        const ms = Number.isNaN(seconds) ? Date.parse(value) - Date.now() : seconds * 1000;
+        return Number.isNaN(ms) ? null : Math.max(0, ms);
+    }
+
+    // Send every queued order, oldest first. Resolves with the server's per-order results;
+    // rejects (leaving the rest queued) when the server cannot be reached, so Background Sync retries.
+    async function flush() {
+        let items = await all();
+        const expired = items.filter(item => Date.now() - item.queuedAt > MAX_QUEUE_AGE);
+        if (expired.length) {
+            await remove(expired.map(item => item.key));
+            items = items.filter(item => !expired.includes(item));
+        }
+        const results = expired.map(item => ({
+            key: item.key,
+            status: 410,
+            success: false,
+            error: 'it was saved more than 30 days ago. Please place it again.'
+        }));
+        while (items.length) {
+            const batch = items.slice(0, MAX_BUNDLE_ORDERS);
+            const { body, headers } = await encode({ orders: batch.map(item => ({ key: item.key, order: item.order })) });
+            const res = await fetch(BULK_URL, { method: 'POST', headers, body });
+            if (!res.ok) {
+                const err = new Error(`Order bundle not accepted (HTTP ${res.status})`);
+                err.retryAfter = retryAfter(res);
+                throw err;
+            }
+            const data = await res.json();
+            // Placed, replayed and rejected orders are final; anything else stays for the next attempt
+            const settled = data.results.filter(r => r.key && r.status < 500).map(r => r.key);
+            await remove(settled);
+            results.push(...data.results);
+            if (settled.length < batch.length) {
+                break;
+            }
+            items = items.slice(MAX_BUNDLE_ORDERS);
+        }
+        return results;
+    }
+
+    // Ask the service worker to flush once the connection is back; false when Background Sync is unavailable
+    async function scheduleFlush() {
+        if (typeof navigator === 'undefined' || !('serviceWorker' in navigator) || !('SyncManager' in scope)) {
+            return false;
+        }
+        const reg = await navigator.serviceWorker.ready;
+        await reg.sync.register(SYNC_TAG);
+        return true;
+    }
+
+    scope.GleOrderQueue = { SYNC_TAG, add, count, flush, scheduleFlush, retryAfter };
+})(self);
@@ -9,6 +9,8 @@ const PRODUCT_PRICE = 25.00;
 const TOPPING_PRICES = { none: 0.00, ube: 3.00, crashed_graham: 2.00 };
 // Holds the most recent order for confirmation modal
 let lastOrder = null;
+// Idempotency-Key for the order being submitted; reused by double taps and retries until it succeeds
+let pendingOrderKey = null;
 const REVIEWS_STORAGE_KEY = 'gleejeyly_reviews';
 
 // Mobile detection
@@ -46,6 +48,14 @@ async function secureFetch(url, options = {}) {
     }
 }
 
+// Unique key per order submission so the server can drop duplicate POSTs
+function newIdempotencyKey() {
+    if (window.crypto && typeof window.crypto.randomUUID === 'function') {
+        return window.crypto.randomUUID();
+    }
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+}
+
 // Toast Notification Utility
 function showToast(message, type = 'info', duration = 3000) {
     const toast = document.createElement('div');
@@ -374,6 +384,9 @@ function initOrderForm() {
         });
     }
     
+    // Editing the order after a failed submit makes it a new order with a new Idempotency-Key
+    ['input', 'change'].forEach(type => orderForm.addEventListener(type, () => { pendingOrderKey = null; }));
+
     // Form submission
     orderForm.addEventListener('submit', async function(e) {
         e.preventDefault();
@@ -424,15 +437,41 @@ function initOrderForm() {
             lastOrder = order;
 
             // Save order to database
+            if (!pendingOrderKey) pendingOrderKey = newIdempotencyKey();
+            let response = null;
             try {
-                const response = await secureFetch(`${API_BASE}/orders`, {
+                response = await secureFetch(`${API_BASE}/orders`, {
                     method: 'POST',
-                    headers: { 'Content-Type': 'application/json' },
+                    headers: { 'Content-Type': 'application/json', 'Idempotency-Key': pendingOrderKey },
                     body: JSON.stringify(order)
                 });
+            } catch (e) {
+                console.warn('Order request failed:', e.message);
+            }
+
+            // Offline, rate limited or server busy: keep the order and send it once we can
+            if (!response || response.status === 429 || response.status >= 500) {
+                const retryAfter = response && window.GleOrderQueue ? GleOrderQueue.retryAfter(response) : null;
+                if (await queueOfflineOrder(pendingOrderKey, order, retryAfter)) {
+                    pendingOrderKey = null;
+                    orderForm.reset();
+                    updateOrderSummary();
+                    if (response) {
+                        showToast('We\'re very busy right now. Your order is saved and will be sent automatically in a moment.', 'info', 6000);
+                    } else {
+                        showToast('You appear to be offline. Your order is saved and will be sent automatically once you\'re back online.', 'info', 6000);
+                    }
+                } else {
+                    showToast('Error saving your order. Please try again.', 'error');
+                }
+                return;
+            }
+
+            try {
                 if (!response.ok) {
                     throw new Error('Failed to save order');
                 }
+                pendingOrderKey = null;
                 const created = await response.json();
                 // prefer server response (includes id); merge with local order as fallback
                 lastOrder = Object.assign({}, order, created || {});
@@ -466,37 +505,99 @@ function initOrderForm() {
     updateOrderSummary();
 }
 
+// Offline order queue (scripts/order-queue.js): orders kept in IndexedDB until they can be sent
+async function queueOfflineOrder(key, order, retryAfter = null) {
+    if (!window.GleOrderQueue || !window.indexedDB) return false;
+    try {
+        await GleOrderQueue.add(key, order);
+        // Without Background Sync the page retries on a timer (and on the 'online' event below)
+        if (!(await GleOrderQueue.scheduleFlush().catch(() => false))) {
+            scheduleFlushRetry(retryAfter);
+        }
+        return true;
+    } catch (e) {
+        console.warn('Could not queue order offline:', e.message);
+        return false;
+    }
+}
+
+// Page-side retries for browsers without Background Sync: a busy server (429/5xx) does not
+// trigger an 'online' event, so queued orders are retried on a timer while online, backing
+// off from 30 seconds to 5 minutes unless the server sent Retry-After
+const FLUSH_RETRY_MIN = 30 * 1000;
+const FLUSH_RETRY_MAX = 5 * 60 * 1000;
+let flushRetryDelay = FLUSH_RETRY_MIN;
+let flushRetryTimer = null;
+let offlineFlush = null;
+
+function scheduleFlushRetry(retryAfter = null) {
+    clearTimeout(flushRetryTimer);
+    const delay = retryAfter != null ? retryAfter : flushRetryDelay;
+    flushRetryDelay = Math.min(flushRetryDelay * 2, FLUSH_RETRY_MAX);
+    flushRetryTimer = setTimeout(flushOfflineOrders, delay);
+}
+
+function flushOfflineOrders() {
+    // One flush at a time, so the timer and the 'online' event never send the queue twice
+    if (!offlineFlush) {
+        offlineFlush = sendOfflineOrders().finally(() => { offlineFlush = null; });
+    }
+    return offlineFlush;
+}
+
+async function sendOfflineOrders() {
+    clearTimeout(flushRetryTimer);
+    // While offline the 'online' listener takes over
+    if (!window.GleOrderQueue || !window.indexedDB || !navigator.onLine) return;
+    try {
+        if (!(await GleOrderQueue.count())) return;
+        reportFlushedOrders(await GleOrderQueue.flush());
+        flushRetryDelay = FLUSH_RETRY_MIN;
+        // Orders the server could not take yet (per-order 5xx) are still queued
+        if (await GleOrderQueue.count()) scheduleFlushRetry();
+    } catch (e) {
+        console.warn('Queued orders not sent yet:', e.message);
+        scheduleFlushRetry(e.retryAfter);
+    }
+}
+
+function reportFlushedOrders(results) {
+    const placed = results.filter(r => r.success).length;
+    if (placed) {
+        showToast(`${placed} saved order${placed > 1 ? 's were' : ' was'} sent successfully! We'll contact you within 24 hours.`, 'success', 5000);
+    }
+    results.filter(r => !r.success && r.status < 500).forEach(r => {
+        showToast(`A saved order could not be placed: ${r.error}`, 'error', 6000);
+    });
+}
+
+// Pricing from /api/pricing, fetched once per page and again when the service worker reports a change
+let pricingRequest = null;
+function loadPricing() {
+    if (!pricingRequest) {
+        pricingRequest = secureFetch(`${API_BASE}/pricing`, { method: 'GET' })
+            .then(res => res.ok ? res.json() : null)
+            .catch(() => null)
+            .then(data => (data && data.toppings) ? data : { basePrice: PRODUCT_PRICE, toppings: TOPPING_PRICES });
+    }
+    return pricingRequest;
+}
+
 function updateOrderSummary() {
     const quantity = parseInt(document.getElementById('quantityValue').value) || 1;
     const topping = document.querySelector('input[name="topping"]:checked')?.value || 'none';
 
-    // Determine display name and topping price
+    // Determine display name
     let toppingName = 'None';
     if (topping === 'ube') toppingName = 'Ube Jam';
     else if (topping === 'crashed_graham') toppingName = 'Extra Crashed Graham';
-    const toppingPrice = TOPPING_PRICES[topping] || 0;
-
-    // Try backend price calculation, fallback to client calc
-    let unitPrice = PRODUCT_PRICE + toppingPrice;
-    let total = unitPrice * quantity;
 
     (async () => {
-        try {
-            const res = await secureFetch(`${API_BASE}/calculate-price`, {
-                method: 'POST',
-                headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ quantity, topping })
-            });
-            if (res.ok) {
-                const data = await res.json();
-                if (data && data.success) {
-                    unitPrice = data.unitPrice;
-                    total = data.totalPrice;
-                }
-            }
-        } catch (e) {
-            // ignore and use client-side calc
-        }
+        // Server prices (usually straight from the service worker cache), client constants as fallback
+        const pricing = await loadPricing();
+        const toppingPrice = pricing.toppings[topping] || 0;
+        const unitPrice = pricing.basePrice + toppingPrice;
+        const total = unitPrice * quantity;
 
         // Update summary display
         const qtyDisplay = document.getElementById('summaryQty');
@@ -717,6 +818,35 @@ if ('serviceWorker' in navigator) {
     }).catch(err => {
         console.warn('ServiceWorker registration failed:', err);
     });
+
+    // The service worker answers from its cache first and tells us when fresher data arrived,
+    // and reports orders it sent from the offline queue
+    navigator.serviceWorker.addEventListener('message', event => {
+        const data = event.data || {};
+        if (data.type === 'orders-flushed') {
+            reportFlushedOrders(data.results || []);
+            return;
+        }
+        if (data.type !== 'api-updated') return;
+        if (data.path === '/api/reviews' && document.getElementById('reviewsList')) {
+            loadReviews();
+        } else if (data.path === '/api/pricing' && document.getElementById('orderForm')) {
+            pricingRequest = null;
+            updateOrderSummary();
+        }
+    });
+}
+
+// Without Background Sync the page sends the offline queue itself: now and whenever the
+// connection returns. With it, only the service worker flushes, so results are reported once.
+if ('SyncManager' in window) {
+    // Re-arm a sync the browser may have given up on
+    if (window.GleOrderQueue && window.indexedDB) {
+        GleOrderQueue.count().then(n => n && GleOrderQueue.scheduleFlush()).catch(() => {});
+    }
+} else {
+    flushOfflineOrders();
+    window.addEventListener('online', flushOfflineOrders);
 }
 
 // 4. Review Form Handler
@@ -0,0 +1,88 @@
+"""Admission control for request lanes.
+
+Each lane allows a fixed number of requests to run at once and lets others
+queue for at most ``queue_budget`` seconds. When the expected wait is already
+over budget the request is refused immediately instead of joining the queue,
+so a burst of slow writes cannot drag every other route down with it.
+Limits are per process (one gunicorn worker with its threads).
+"""
+import threading
+import time
+
+# Weight of the newest sample in the moving average of service time
+_EWMA_WEIGHT = 0.2
+# Waiting requests allowed per slot, whatever the estimate says (covers stalled requests)
+_MAX_WAITING_PER_SLOT = 4
+
+
+class Lane:
+    def __init__(self, name, max_concurrent, queue_budget, initial_service_time=None):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.queue_budget = queue_budget
+        # Until requests have completed, assume the worst so a cold lane sheds instead of queueing
+        self.service_time = queue_budget if initial_service_time is None else initial_service_time
+        self.max_waiting = max_concurrent * _MAX_WAITING_PER_SLOT
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+
+    def _estimated_wait(self):
+        if self.active < self.max_concurrent:
+            return 0.0
+        return (self.waiting + 1) * self.service_time / self.max_concurrent
+
+    def acquire(self):
+        """Try to enter the lane. Returns (admitted, suggested retry delay in seconds)."""
+        with self._lock:
+            wait = self._estimated_wait()
+            if wait > self.queue_budget or self.waiting >= self.max_waiting:
+                self.shed += 1
+                return False, max(wait, self.service_time)
+            self.waiting += 1
+
+        acquired = self._slots.acquire(timeout=self.queue_budget)
+        with self._lock:
+            self.waiting -= 1
+            if not acquired:
+                self.shed += 1
+                return False, self.queue_budget
+            self.active += 1
+            self.admitted += 1
+        return True, 0.0
+
+    def release(self, elapsed):
+        with self._lock:
+            self.active -= 1
+            self.service_time += _EWMA_WEIGHT * (elapsed - self.service_time)
+        self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'limit': self.max_concurrent,
+                'queueBudgetMs': int(self.queue_budget * 1000),
+                'active': self.active,
+                'waiting': self.waiting,
+                'admitted': self.admitted,
+                'shed': self.shed,
+                'avgServiceMs': round(self.service_time * 1000, 1)
+            }
+
+
+class AdmissionController:
+    def __init__(self, lanes):
+        self.lanes = {lane.name: lane for lane in lanes}
+        self.started = time.time()
+
+    def __getitem__(self, name):
+        return self.lanes[name]
+
+    def stats(self):
+        return {
+            'uptimeSeconds': int(time.time() - self.started),
+            'lanes': {name: lane.stats() for name, lane in self.lanes.items()}
+        }
@@ -0,0 +1,168 @@
+"""Cold storage for old orders.
+
+Orders older than a configurable age are rolled out of the hot
+``orders.json`` file into gzip-compressed, per-month segment files that are
+never rewritten once created. A small ``index.json`` records the ID range,
+date range, order count and revenue of every segment so most questions
+(totals, which months exist) never have to open a segment at all.
+"""
+import gzip
+import json
+import os
+from datetime import datetime
+
+from filestore import FileLock, write_json_atomic
+
+INDEX_NAME = 'index.json'
+LOCK_NAME = '.archive.lock'
+
+
+def naive_local(dt):
+    """Server timestamps are naive local time; convert aware ones so they compare"""
+    if dt.tzinfo is not None:
+        return dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def parse_created_at(order):
+    """Return the order's creation time as a datetime, or None if unknown"""
+    value = order.get('createdAt')
+    if not value:
+        return None
+    try:
+        return naive_local(datetime.fromisoformat(str(value)))
+    except ValueError:
+        return None
+
+
+def order_revenue(order):
+    """Total price of an order, accepting the legacy ``total`` field"""
+    total = order.get('totalPrice')
+    if total is None:
+        total = order.get('total', 0)
+    try:
+        return float(total)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _write_segment(path, orders):
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+        json.dump(orders, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+class OrderArchive:
+    """Immutable monthly segments of archived orders plus their index"""
+
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        self.index_file = os.path.join(archive_dir, INDEX_NAME)
+        os.makedirs(archive_dir, exist_ok=True)
+
+    def lock(self):
+        """Exclusive lock so only one gunicorn worker archives at a time"""
+        return FileLock(os.path.join(self.archive_dir, LOCK_NAME))
+
+    def read_index(self):
+        try:
+            with open(self.index_file, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return []
+
+    def read_segment(self, entry):
+        path = os.path.join(self.archive_dir, entry['file'])
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return []
+
+    def summary(self):
+        """Count and revenue of everything archived, from the index alone"""
+        index = self.read_index()
+        return {
+            'segments': len(index),
+            'count': sum(entry['count'] for entry in index),
+            'revenue': round(sum(entry['revenue'] for entry in index), 2),
+            'months': sorted({entry['month'] for entry in index})
+        }
+
+    def split_expired(self, orders, cutoff):
+        """Partition orders into (still hot, due for archiving) by creation time"""
+        hot, expired = [], []
+        for order in orders:
+            created = parse_created_at(order)
+            if created is not None and created < cutoff:
+                expired.append(order)
+            else:
+                hot.append(order)
+        return hot, expired
+
+    def append(self, orders):
+        """Write ``orders`` as new segments, one per month, and update the index.
+
+        Existing segments are never modified: if a month already has segments,
+        another numbered segment is added alongside them. Callers must hold
+        :meth:`lock`.
+        """
+        if not orders:
+            return []
+
+        by_month = {}
+        for order in orders:
+            month = parse_created_at(order).strftime('%Y-%m')
+            by_month.setdefault(month, []).append(order)
+
+        index = self.read_index()
+        new_entries = []
+        for month in sorted(by_month):
+            month_orders = sorted(by_month[month], key=lambda o: o.get('createdAt', ''))
+            part = sum(1 for entry in index if entry['month'] == month) + 1
+            filename = f"orders-{month}-{part:03d}.json.gz"
+            _write_segment(os.path.join(self.archive_dir, filename), month_orders)
+
+            ids = [o['id'] for o in month_orders if isinstance(o.get('id'), int)]
+            entry = {
+                'file': filename,
+                'month': month,
+                'minId': min(ids) if ids else None,
+                'maxId': max(ids) if ids else None,
+                'from': month_orders[0].get('createdAt'),
+                'to': month_orders[-1].get('createdAt'),
+                'count': len(month_orders),
+                'revenue': round(sum(order_revenue(o) for o in month_orders), 2)
+            }
+            index.append(entry)
+            new_entries.append(entry)
+
+        write_json_atomic(self.index_file, index, indent=2)
+        return new_entries
+
+    def query(self, start=None, end=None):
+        """Yield archived orders created within [start, end), reading only overlapping segments"""
+        for entry in self.read_index():
+            seg_from = naive_local(datetime.fromisoformat(entry['from']))
+            seg_to = naive_local(datetime.fromisoformat(entry['to']))
+            if start is not None and seg_to < start:
+                continue
+            if end is not None and seg_from >= end:
+                continue
+            for order in self.read_segment(entry):
+                created = parse_created_at(order)
+                if start is not None and created < start:
+                    continue
+                if end is not None and created >= end:
+                    continue
+                yield order
+
+    def clear(self):
+        """Remove every segment and the index"""
+        for entry in self.read_index():
+            try:
+                os.remove(os.path.join(self.archive_dir, entry['file']))
+            except FileNotFoundError:
+                pass
+        write_json_atomic(self.index_file, [], indent=2)
@@ -0,0 +1,110 @@
+"""Sampled, redacted capture of API traffic for replay load tests.
+
+Requests are turned into one JSON line each (method, path, body, arrival
+time, inter-arrival gap, status, latency) and handed to a background thread
+through a bounded queue, so a slow disk never holds up a response. When the
+queue is full the record is dropped and counted. Personal data in bodies is
+replaced with placeholders that still pass the server's validation, so the
+captured traffic replays as valid orders and reviews.
+"""
+import json
+import logging
+import os
+import queue
+import random
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Placeholder values for personal fields; chosen to pass validate_order_input / validate_review_input
+REDACTED_FIELDS = {
+    'fullName': 'Redacted Customer',
+    'phoneNumber': '09000000000',
+    'facebook': 'redacted',
+    'name': 'Redacted',
+    'email': 'redacted@example.com',
+    'username': 'redacted',
+    'password': 'redacted',
+}
+
+
+def redact(body):
+    if isinstance(body, list):
+        return [redact(item) for item in body]
+    if not isinstance(body, dict):
+        return body
+    redacted = {}
+    for key, value in body.items():
+        if key in REDACTED_FIELDS:
+            redacted[key] = REDACTED_FIELDS[key]
+        elif key == 'comment' and isinstance(value, str):
+            # Keep the length so replayed payload sizes match production
+            redacted[key] = 'x' * len(value)
+        else:
+            redacted[key] = redact(value)
+    return redacted
+
+
+class TrafficCapture:
+    def __init__(self, path, sample_rate=1.0, max_pending=10000):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.captured = 0
+        self.dropped = 0
+        self._last_arrival = None
+        self._lock = threading.Lock()
+        self._writer = threading.Thread(target=self._write_loop, name='traffic-capture', daemon=True)
+        self._writer.start()
+
+    def should_sample(self):
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate
+
+    def record(self, arrival, method, path, body, status, elapsed):
+        with self._lock:
+            gap = 0.0 if self._last_arrival is None else max(0.0, arrival - self._last_arrival)
+            self._last_arrival = arrival
+        entry = {
+            'ts': round(arrival, 6),
+            'dt': round(gap, 6),
+            'method': method,
+            'path': path,
+            'body': redact(body),
+            'status': status,
+            'ms': round(elapsed * 1000, 2)
+        }
+        try:
+            self.pending.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        while True:
+            entry = self.pending.get()
+            lines = [entry]
+            # Drain whatever else is waiting so bursts become one write
+            while True:
+                try:
+                    lines.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            data = ''.join(json.dumps(line, separators=(',', ':')) + '\n' for line in lines).encode('utf-8')
+            try:
+                # One O_APPEND write per batch keeps lines from different workers from interleaving
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                finally:
+                    os.close(fd)
+                self.captured += len(lines)
+            except OSError as e:
+                self.dropped += len(lines)
+                logger.error(f"Traffic capture write failed: {str(e)}")
+
+    def stats(self):
+        return {
+            'sampleRate': self.sample_rate,
+            'captured': self.captured,
+            'dropped': self.dropped,
+            'pending': self.pending.qsize()
+        }
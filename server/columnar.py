@@ -0,0 +1,174 @@
+"""Compact column-oriented in-memory representation of orders.
+
+A list of order dicts costs several hundred bytes per order (the dict itself
+plus a boxed object for every value). ``ColumnarOrderStore`` keeps the
+numeric fields in ``array`` columns, dictionary-encodes ``topping`` and
+interns the remaining strings, and only builds dicts when rows are read back.
+"""
+import sys
+from array import array
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# (field, array typecode, canonical Python type)
+NUMERIC_COLUMNS = (
+    ('id', 'q', int),
+    ('quantity', 'l', int),
+    ('unitPrice', 'd', float),
+    ('totalPrice', 'd', float),
+)
+STRING_COLUMNS = ('fullName', 'phoneNumber', 'facebook', 'pickupDate')
+COLUMN_FIELDS = tuple(name for name, _, _ in NUMERIC_COLUMNS) + ('createdAt', 'topping') + STRING_COLUMNS
+
+# Bit per column in the per-row ``present`` mask
+FIELD_BITS = {name: 1 << i for i, name in enumerate(COLUMN_FIELDS)}
+
+
+def _to_micros(value):
+    """createdAt string -> microseconds since epoch, or None if it would not round-trip"""
+    if not isinstance(value, str):
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if dt.tzinfo is not None or dt.isoformat() != value:
+        return None
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(micros):
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+class ColumnarOrderStore:
+    """Append-only column store for orders.
+
+    Values that do not fit a column (legacy keys, unexpected types, createdAt
+    strings that would not round-trip) are kept verbatim in a sparse
+    per-row ``extras`` dict, so ``row(i)`` always equals the original order.
+    """
+
+    def __init__(self):
+        self.numeric = {name: array(code) for name, code, _ in NUMERIC_COLUMNS}
+        self.created = array('q')
+        self.topping_codes = array('B')
+        self.topping_values = []
+        self._topping_lookup = {}
+        self.strings = {name: [] for name in STRING_COLUMNS}
+        self.present = array('H')
+        self.extras = {}
+
+    @classmethod
+    def from_orders(cls, orders):
+        store = cls()
+        for order in orders:
+            store.append(order)
+        return store
+
+    def __len__(self):
+        return len(self.present)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def _topping_code(self, topping):
+        code = self._topping_lookup.get(topping)
+        if code is None:
+            if len(self.topping_values) >= 255:
+                return None
+            code = len(self.topping_values)
+            self.topping_values.append(topping)
+            self._topping_lookup[topping] = code
+        return code
+
+    def append(self, order):
+        mask = 0
+        extra = {}
+
+        for name, code, kind in NUMERIC_COLUMNS:
+            value = order.get(name)
+            # bool is an int subclass; keep it out of numeric columns so it round-trips as bool
+            if type(value) is kind or (kind is float and type(value) is int):
+                try:
+                    self.numeric[name].append(value)
+                    mask |= FIELD_BITS[name]
+                    if kind is float and type(value) is int:
+                        extra[name] = value
+                    continue
+                except OverflowError:
+                    pass
+            self.numeric[name].append(0)
+            if name in order:
+                extra[name] = value
+
+        micros = _to_micros(order.get('createdAt'))
+        if micros is not None:
+            self.created.append(micros)
+            mask |= FIELD_BITS['createdAt']
+        else:
+            self.created.append(0)
+            if 'createdAt' in order:
+                extra['createdAt'] = order['createdAt']
+
+        topping = order.get('topping')
+        code = self._topping_code(topping) if isinstance(topping, str) else None
+        if code is not None:
+            self.topping_codes.append(code)
+            mask |= FIELD_BITS['topping']
+        else:
+            self.topping_codes.append(0)
+            if 'topping' in order:
+                extra['topping'] = topping
+
+        for name in STRING_COLUMNS:
+            value = order.get(name)
+            if isinstance(value, str):
+                self.strings[name].append(sys.intern(value))
+                mask |= FIELD_BITS[name]
+            else:
+                self.strings[name].append(None)
+                if name in order:
+                    extra[name] = value
+
+        for key, value in order.items():
+            if key not in FIELD_BITS:
+                extra[key] = value
+
+        if extra:
+            self.extras[len(self.present)] = extra
+        self.present.append(mask)
+
+    def row(self, i):
+        """Materialize row ``i`` as an order dict"""
+        mask = self.present[i]
+        order = {}
+        for name, _, _ in NUMERIC_COLUMNS:
+            if mask & FIELD_BITS[name]:
+                order[name] = self.numeric[name][i]
+        if mask & FIELD_BITS['createdAt']:
+            order['createdAt'] = _from_micros(self.created[i])
+        if mask & FIELD_BITS['topping']:
+            order['topping'] = self.topping_values[self.topping_codes[i]]
+        for name in STRING_COLUMNS:
+            if mask & FIELD_BITS[name]:
+                order[name] = self.strings[name][i]
+        extra = self.extras.get(i)
+        if extra:
+            order.update(extra)
+        return order
+
+    def to_list(self):
+        return list(self)
+
+    def column(self, name):
+        """Raw column for analytics: an ``array`` for numeric fields and createdAt (µs since epoch)"""
+        if name == 'createdAt':
+            return self.created
+        return self.numeric[name]
+
+    def has(self, i, name):
+        return bool(self.present[i] & FIELD_BITS[name])
@@ -0,0 +1,44 @@
+"""Small helpers shared by the JSON file stores in ``data/``."""
+import json
+import os
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single-process use still works
+    fcntl = None
+
+
+def file_version(path):
+    """(mtime, size) of a file, used to notice writes made by other workers"""
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+
+def write_json_atomic(path, data, **dump_kwargs):
+    """Write JSON to a temp file and rename it over ``path`` so readers never see half a file"""
+    tmp_path = f"{path}.tmp.{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, **dump_kwargs)
+    os.replace(tmp_path, path)
+
+
+class FileLock:
+    """Exclusive advisory lock on ``path`` shared by all gunicorn workers"""
+
+    def __init__(self, path):
+        self.path = path
+        self.handle = None
+
+    def __enter__(self):
+        self.handle = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.handle, fcntl.LOCK_UN)
+        self.handle.close()
@@ -0,0 +1,166 @@
+"""Idempotency-Key support for order submission.
+
+Responses to keyed requests are kept in a bounded TTL/LRU cache. Each worker
+holds the cache in memory and writes it through to a JSON file in ``data/``,
+so a retry that lands on a different gunicorn worker still finds the
+original response. ``OrderKeyIndex`` remembers which order each key created
+for as long as the order form may hold an order in its offline queue.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from filestore import FileLock, file_version, write_json_atomic
+
+MAX_KEY_LENGTH = 255
+
+
+def valid_key(key):
+    return 0 < len(key) <= MAX_KEY_LENGTH and key.isprintable()
+
+
+def fingerprint(payload):
+    """Stable hash of the request fields that decide what gets stored"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class IdempotencyCache:
+    """key -> {fingerprint, status, body, expires}, oldest-used first"""
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.version = None
+        # Guards ``entries`` between request threads of one worker; lock() is for other workers
+        self._entries_lock = threading.Lock()
+
+    def lock(self):
+        """Held across lookup and insert so concurrent retries of one key create one order"""
+        return FileLock(f"{self.path}.lock")
+
+    def _sync(self):
+        """Reload from disk if another worker has written since we last looked. Needs ``_entries_lock``."""
+        version = file_version(self.path)
+        if version == self.version:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = OrderedDict(json.load(f))
+        except (json.JSONDecodeError, FileNotFoundError):
+            self.entries = OrderedDict()
+        self.version = version
+
+    def _evict(self, now):
+        for key in [k for k, entry in self.entries.items() if entry['expires'] <= now]:
+            del self.entries[key]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key):
+        """Stored entry for ``key``, or None. Costs a stat; the file is only re-read after another worker wrote it."""
+        now = time.time()
+        with self._entries_lock:
+            # Checked on hits too, so keys cleared by another worker stop replaying
+            self._sync()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry['expires'] <= now:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, request_fingerprint, status, body):
+        """Record a response and persist the cache. Callers must hold :meth:`lock`."""
+        self.put_many([(key, request_fingerprint, status, body)])
+
+    def put_many(self, items):
+        """Record several (key, fingerprint, status, body) responses with a single file write"""
+        now = time.time()
+        with self._entries_lock:
+            self._sync()
+            for key, request_fingerprint, status, body in items:
+                self.entries[key] = {
+                    'fingerprint': request_fingerprint,
+                    'status': status,
+                    'body': body,
+                    'expires': now + self.ttl
+                }
+                self.entries.move_to_end(key)
+            self._evict(now)
+            snapshot = dict(self.entries)
+        write_json_atomic(self.path, snapshot)
+        with self._entries_lock:
+            self.version = file_version(self.path)
+
+    def clear(self):
+        """Forget every key. Callers must hold :meth:`lock`."""
+        with self._entries_lock:
+            self.entries = OrderedDict()
+            write_json_atomic(self.path, {})
+            self.version = file_version(self.path)
+
+
+class OrderKeyIndex:
+    """key -> [order id, fingerprint, expires] for every stored keyed order.
+
+    Lives much longer than the response cache, so an order queued offline for days
+    is still recognised, while the key itself stays off the order record.
+    """
+
+    def __init__(self, path, ttl):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        self.version = None
+        self._entries_lock = threading.Lock()
+
+    def _sync(self):
+        """Reload from disk if another worker has written since we last looked. Needs ``_entries_lock``."""
+        version = file_version(self.path)
+        if version == self.version:
+            return
+        try:
+            with open(self.path, 'r') as f:
+                self.entries = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            self.entries = {}
+        self.version = version
+
+    def lookup(self, keys):
+        """{key: (order id, fingerprint)} for those of ``keys`` that are indexed"""
+        now = time.time()
+        found = {}
+        with self._entries_lock:
+            self._sync()
+            for key in keys:
+                entry = self.entries.get(key)
+                if entry is not None and entry[2] > now:
+                    found[key] = (entry[0], entry[1])
+        return found
+
+    def add_many(self, items):
+        """Index (key, order id, fingerprint) triples. Callers must hold the IdempotencyCache lock."""
+        now = time.time()
+        with self._entries_lock:
+            self._sync()
+            self.entries = {key: entry for key, entry in self.entries.items() if entry[2] > now}
+            for key, order_id, request_fingerprint in items:
+                self.entries[key] = [order_id, request_fingerprint, now + self.ttl]
+            snapshot = dict(self.entries)
+        write_json_atomic(self.path, snapshot)
+        with self._entries_lock:
+            self.version = file_version(self.path)
+
+    def clear(self):
+        """Forget every key. Callers must hold the IdempotencyCache lock."""
+        with self._entries_lock:
+            self.entries = {}
+            write_json_atomic(self.path, {})
+            self.version = file_version(self.path)
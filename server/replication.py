@@ -0,0 +1,245 @@
+"""Primary/follower replication of the order and review stores.
+
+The primary appends every write to a JSON-lines change log with a global
+sequence number. Followers bootstrap from a snapshot, then tail the log over
+HTTP and apply it to their own ``data/`` files, so they can serve every GET
+route locally. Followers keep their progress in a small state file that all
+of their workers share, which is also where replication lag is reported from.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from filestore import FileLock, file_version, write_json_atomic
+
+# A sparse seq -> byte offset entry is remembered about every INDEX_EVERY changes
+INDEX_EVERY = 256
+
+
+class ChangeLog:
+    """Append-only change log shared by all workers of the primary"""
+
+    def __init__(self, path):
+        self.path = path
+        self._tail_cache = (None, 0, None)  # (file version, last seq, last ts)
+        self._index_inode = None
+        self._index_seqs = [0]
+        self._index_offsets = [0]
+        self._lock = threading.Lock()
+
+    def lock(self):
+        return FileLock(f"{self.path}.lock")
+
+    def _read_tail(self):
+        """(seq, ts) of the last entry, reading backwards from the end of the file"""
+        version = file_version(self.path)
+        if version == self._tail_cache[0]:
+            return self._tail_cache[1], self._tail_cache[2]
+        seq, ts = 0, None
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                end = f.tell()
+                chunk = b''
+                pos = end
+                while pos > 0:
+                    step = min(4096, pos)
+                    pos -= step
+                    f.seek(pos)
+                    chunk = f.read(step) + chunk
+                    lines = chunk.rstrip(b'\n').split(b'\n')
+                    if len(lines) > 1 or pos == 0:
+                        if lines[-1]:
+                            last = json.loads(lines[-1])
+                            seq, ts = last['seq'], last['ts']
+                        break
+        except FileNotFoundError:
+            pass
+        self._tail_cache = (version, seq, ts)
+        return seq, ts
+
+    def last(self):
+        return self._read_tail()
+
+    def append(self, store, op, record=None):
+        """Log one change and return its sequence number"""
+        with self.lock():
+            seq = self._read_tail()[0] + 1
+            entry = {'seq': seq, 'ts': time.time(), 'store': store, 'op': op}
+            if record is not None:
+                entry['record'] = record
+            data = (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+            self._tail_cache = (file_version(self.path), seq, entry['ts'])
+        return seq
+
+    def compact(self, store, clear_seq):
+        """Drop the entries for ``store`` logged before its clear at ``clear_seq``.
+
+        The cleared records (customer names and phone numbers) then no longer sit on
+        disk or get served to a follower reading from an old seq. Sequence numbers are
+        kept, so a follower that is behind still receives the clear itself.
+        """
+        with self.lock():
+            tmp_path = f"{self.path}.tmp.{os.getpid()}"
+            dropped = 0
+            try:
+                with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    for line in src:
+                        entry = json.loads(line)
+                        if entry['store'] == store and entry['seq'] < clear_seq:
+                            dropped += 1
+                            continue
+                        dst.write(line)
+            except FileNotFoundError:
+                return 0
+            # Other workers notice the new inode and drop their offset index
+            os.replace(tmp_path, self.path)
+            self._tail_cache = (None, 0, None)
+        return dropped
+
+    def read_since(self, since, limit):
+        """Up to ``limit`` changes with seq > ``since``, oldest first"""
+        changes = []
+        try:
+            with open(self.path, 'rb') as f:
+                inode = os.fstat(f.fileno()).st_ino
+                with self._lock:
+                    if inode != self._index_inode:
+                        self._index_inode = inode
+                        self._index_seqs, self._index_offsets = [0], [0]
+                    start = bisect.bisect_right(self._index_seqs, since) - 1
+                    f.seek(self._index_offsets[start])
+                while len(changes) < limit:
+                    line_offset = f.tell()
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        break  # end of file, or a line still being written
+                    entry = json.loads(line)
+                    if entry['seq'] - 1 >= self._index_seqs[-1] + INDEX_EVERY:
+                        self._remember_offset(inode, entry['seq'] - 1, line_offset)
+                    if entry['seq'] > since:
+                        changes.append(entry)
+        except FileNotFoundError:
+            pass
+        return changes
+
+    def _remember_offset(self, inode, seq, offset):
+        with self._lock:
+            if inode == self._index_inode and seq > self._index_seqs[-1]:
+                self._index_seqs.append(seq)
+                self._index_offsets.append(offset)
+
+
+class ReplicaState:
+    """Follower progress, shared by every worker through a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def lock(self):
+        return FileLock(f"{self.path}.lock")
+
+    def load(self):
+        try:
+            with open(self.path, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {'appliedSeq': None}
+
+    def save(self, state):
+        write_json_atomic(self.path, state, indent=2)
+
+    def status(self):
+        state = self.load()
+        applied, primary = state.get('appliedSeq') or 0, state.get('primarySeq') or 0
+        lag_seconds = 0.0
+        if primary > applied and state.get('primaryTs') and state.get('appliedTs'):
+            lag_seconds = max(0.0, state['primaryTs'] - state['appliedTs'])
+        last_poll = state.get('lastPollAt')
+        return {
+            'appliedSeq': applied,
+            'primarySeq': primary,
+            'lagChanges': max(0, primary - applied),
+            'lagSeconds': round(lag_seconds, 3),
+            'secondsSinceLastPoll': round(time.time() - last_poll, 3) if last_poll else None,
+            'lastError': state.get('lastError')
+        }
+
+
+class Follower(threading.Thread):
+    """Background thread that tails the primary's change log"""
+
+    def __init__(self, primary_url, token, state, interval, apply_snapshot, apply_changes, logger,
+                 batch_size=1000, timeout=30):
+        super().__init__(name='replication-follower', daemon=True)
+        self.primary_url = primary_url.rstrip('/')
+        self.token = token
+        self.state = state
+        self.interval = interval
+        self.apply_snapshot = apply_snapshot
+        self.apply_changes = apply_changes
+        self.logger = logger
+        self.batch_size = batch_size
+        self.timeout = timeout
+        self._wake = threading.Event()
+
+    def wake(self):
+        """Poll now instead of waiting for the next interval (e.g. after forwarding a write)"""
+        self._wake.set()
+
+    def _get(self, path, params=None):
+        url = f"{self.primary_url}{path}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        req = urllib.request.Request(url, headers={'Authorization': f"Bearer {self.token}"})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.load(resp)
+
+    def poll_once(self):
+        # The lock makes sure only one worker applies a given batch
+        with self.state.lock():
+            state = self.state.load()
+            try:
+                if state.get('appliedSeq') is None:
+                    snapshot = self._get('/api/replication/snapshot')
+                    self.apply_snapshot(snapshot)
+                    state.update(appliedSeq=snapshot['seq'], appliedTs=snapshot.get('ts'))
+                    self.logger.info(f"Replica bootstrapped from snapshot at seq {snapshot['seq']}")
+
+                while True:
+                    batch = self._get('/api/replication/changes',
+                                      {'since': state['appliedSeq'], 'limit': self.batch_size})
+                    state.update(primarySeq=batch['lastSeq'], primaryTs=batch.get('lastTs'))
+                    changes = batch['changes']
+                    if changes:
+                        self.apply_changes(changes)
+                        state.update(appliedSeq=changes[-1]['seq'], appliedTs=changes[-1]['ts'])
+                        # Saved per batch so a crash re-applies at most one (idempotently applied) batch
+                        self.state.save(state)
+                    if len(changes) < self.batch_size:
+                        break
+                state.update(lastPollAt=time.time(), lastError=None)
+            except (urllib.error.URLError, OSError, ValueError, KeyError) as e:
+                state['lastError'] = str(e)
+                self.logger.warning(f"Replication poll failed: {str(e)}")
+            finally:
+                self.state.save(state)
+
+    def run(self):
+        while True:
+            try:
+                self.poll_once()
+            except Exception as e:
+                self.logger.error(f"Replication error: {str(e)}")
+            self._wake.wait(self.interval)
+            self._wake.clear()
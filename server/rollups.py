@@ -0,0 +1,172 @@
+"""Pre-aggregated order volume and revenue for the dashboard analytics.
+
+Orders are rolled up per day and topping, once keyed by creation date and
+once by pickup date. Week and month series are folded from the daily table
+at query time, which stays small (one row per day per topping) however many
+orders there are. Full rebuilds read the order dicts in a single pass.
+"""
+from datetime import date, timedelta
+
+from archive import order_revenue, parse_created_at
+
+BUCKETS = ('day', 'week', 'month')
+DATE_FIELDS = ('created', 'pickup')
+GROUP_BYS = ('none', 'topping')
+
+# Pickup dates come straight from the public order form; ones outside this window are ignored
+# so a single "9999-12-31" cannot stretch every pickup series by millennia
+PICKUP_MIN_DATE = date(2000, 1, 1)
+PICKUP_MAX_DAYS_AHEAD = 2 * 366
+# Longest series returned; wider spans need a coarser bucket or a from/to range
+MAX_SERIES_LABELS = 3660
+_BUCKET_DAYS = {'day': 1, 'week': 7, 'month': 28}
+
+
+def _pickup_ordinal(value, cache):
+    """Day ordinal of a YYYY-MM-DD pickup date, or None if it is not a date in the accepted window"""
+    if value in cache:
+        return cache[value]
+    try:
+        ordinal = date.fromisoformat(value[:10]).toordinal()
+    except ValueError:
+        ordinal = None
+    if ordinal is not None and not (PICKUP_MIN_DATE.toordinal() <= ordinal
+                                    <= date.today().toordinal() + PICKUP_MAX_DAYS_AHEAD):
+        ordinal = None
+    cache[value] = ordinal
+    return ordinal
+
+
+def _order_facts(order, pickup_cache):
+    """(created ordinal, pickup ordinal, topping, quantity, revenue) of one order; ordinals may be None.
+
+    Shared by ``add`` and ``build``; values of the wrong type (a bool quantity, a non-string
+    topping or pickupDate) count as missing.
+    """
+    topping = order.get('topping')
+    if not isinstance(topping, str) or not topping:
+        topping = 'none'
+    quantity = order.get('quantity')
+    if type(quantity) is not int:
+        quantity = 0
+    pickup = order.get('pickupDate')
+    created = parse_created_at(order)
+    return (created.toordinal() if created is not None else None,
+            _pickup_ordinal(pickup, pickup_cache) if isinstance(pickup, str) else None,
+            topping, quantity, order_revenue(order))
+
+
+def _bucket_label(ordinal, bucket):
+    day = date.fromordinal(ordinal)
+    if bucket == 'week':
+        return (day - timedelta(days=day.weekday())).isoformat()
+    if bucket == 'month':
+        return day.strftime('%Y-%m')
+    return day.isoformat()
+
+
+def _bucket_labels(first, last, bucket):
+    """Every bucket label from ``first`` to ``last`` (day ordinals), so charts have no gaps"""
+    labels = []
+    ordinal = first
+    while ordinal <= last:
+        label = _bucket_label(ordinal, bucket)
+        if not labels or labels[-1] != label:
+            labels.append(label)
+        ordinal += 1
+    return labels
+
+
+class OrderRollups:
+    """Daily (orders, quantity, revenue) totals per topping for each date field"""
+
+    def __init__(self):
+        # date field -> day ordinal -> topping -> [orders, quantity, revenue]
+        self.tables = {field: {} for field in DATE_FIELDS}
+
+    def _bump(self, field, ordinal, topping, orders, quantity, revenue):
+        cell = self.tables[field].setdefault(ordinal, {}).setdefault(topping, [0, 0, 0.0])
+        cell[0] += orders
+        cell[1] += quantity
+        cell[2] += revenue
+
+    def add(self, order):
+        """Fold a single new order into the tables"""
+        self._add_facts(*_order_facts(order, {}))
+
+    def _add_facts(self, created, pickup, topping, quantity, revenue):
+        if created is not None:
+            self._bump('created', created, topping, 1, quantity, revenue)
+        if pickup is not None:
+            self._bump('pickup', pickup, topping, 1, quantity, revenue)
+
+    def merged(self, other):
+        """New rollups holding the sums of ``self`` and ``other``"""
+        result = OrderRollups()
+        for source in (self, other):
+            for field, table in source.tables.items():
+                for ordinal, cells in table.items():
+                    for topping, (orders, quantity, revenue) in cells.items():
+                        result._bump(field, ordinal, topping, orders, quantity, revenue)
+        return result
+
+    @classmethod
+    def build(cls, sources):
+        """Rebuild from scratch over one or more iterables of order dicts"""
+        rollups = cls()
+        pickup_cache = {}
+        for orders in sources:
+            for order in orders:
+                rollups._add_facts(*_order_facts(order, pickup_cache))
+        return rollups
+
+    def series(self, bucket='day', group_by='none', date_field='created', start=None, end=None):
+        """Chart-ready series: shared bucket labels plus one array per group.
+
+        ``start`` / ``end`` are optional ``date`` bounds (inclusive / exclusive). Raises
+        ValueError when the range would need more than MAX_SERIES_LABELS buckets.
+        """
+        table = self.tables[date_field]
+        days = sorted(ordinal for ordinal in table
+                      if (start is None or ordinal >= start.toordinal())
+                      and (end is None or ordinal < end.toordinal()))
+        if not days:
+            return {'bucket': bucket, 'groupBy': group_by, 'date': date_field, 'labels': [], 'series': [],
+                    'totals': {'orders': 0, 'quantity': 0, 'revenue': 0}}
+
+        if (days[-1] - days[0]) // _BUCKET_DAYS[bucket] + 1 > MAX_SERIES_LABELS:
+            raise ValueError(f"More than {MAX_SERIES_LABELS} {bucket} buckets; use a coarser bucket or from/to")
+        labels = _bucket_labels(days[0], days[-1], bucket)
+        position = {label: i for i, label in enumerate(labels)}
+        groups = {}
+        for ordinal in days:
+            slot = position[_bucket_label(ordinal, bucket)]
+            for topping, (orders, quantity, revenue) in table[ordinal].items():
+                name = topping if group_by == 'topping' else 'all'
+                series = groups.get(name)
+                if series is None:
+                    series = groups[name] = {
+                        'name': name,
+                        'orders': [0] * len(labels),
+                        'quantity': [0] * len(labels),
+                        'revenue': [0.0] * len(labels)
+                    }
+                series['orders'][slot] += orders
+                series['quantity'][slot] += quantity
+                series['revenue'][slot] += revenue
+
+        for series in groups.values():
+            series['revenue'] = [round(value, 2) for value in series['revenue']]
+        result = [groups[name] for name in sorted(groups)]
+        return {
+            'bucket': bucket,
+            'groupBy': group_by,
+            'date': date_field,
+            'labels': labels,
+            'series': result,
+            'totals': {
+                'orders': sum(sum(s['orders']) for s in result),
+                'quantity': sum(sum(s['quantity']) for s in result),
+                'revenue': round(sum(sum(s['revenue']) for s in result), 2)
+            }
+        }
@@ -1,4 +1,4 @@
-from flask import Flask, jsonify, request, render_template, redirect, url_for, session, send_from_directory
+from flask import Flask, g, jsonify, request, render_template, redirect, url_for, session, send_from_directory
 from flask_cors import CORS
 import json
 import os
@@ -7,8 +7,24 @@ import logging
 from functools import wraps
 import time
 import re
+import sys
+import math
+import hmac
+import urllib.error
+import urllib.request
+import zlib
 from werkzeug.security import check_password_hash, generate_password_hash
 
+# Sibling modules are importable whether started as `python server/server.py` or via gunicorn
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from admission import AdmissionController, Lane
+from archive import OrderArchive, naive_local, parse_created_at
+from capture import TrafficCapture
+from filestore import FileLock, file_version, write_json_atomic
+from idempotency import IdempotencyCache, OrderKeyIndex, fingerprint, valid_key
+from replication import ChangeLog, Follower, ReplicaState
+from rollups import BUCKETS, DATE_FIELDS, GROUP_BYS, OrderRollups
+
 app = Flask(__name__, template_folder='.', static_folder='.')
 
 # Security: Configure CORS with restricted origins
@@ -38,14 +54,14 @@ logger = logging.getLogger(__name__)
 
 # Rate limiting helper
 request_counts = {}
-RATE_LIMIT = 100  # requests
+RATE_LIMIT = int(os.environ.get('RATE_LIMIT', 100))  # requests
 RATE_WINDOW = 60  # seconds
 
 def rate_limit(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
         now = time.time()
-        ip = request.remote_addr
+        ip = client_ip()
         
         if ip not in request_counts:
             request_counts[ip] = []
@@ -63,6 +79,50 @@ def rate_limit(f):
     
     return decorated_function
 
+# Admission control: writes share a small lane that sheds load once its queue is over budget;
+# health, pricing and the dashboard get their own lane so they stay fast during a write spike
+WRITE_CONCURRENCY = int(os.environ.get('WRITE_CONCURRENCY', 4))
+WRITE_QUEUE_BUDGET = float(os.environ.get('WRITE_QUEUE_BUDGET', 2.0))  # seconds
+PRIORITY_CONCURRENCY = int(os.environ.get('PRIORITY_CONCURRENCY', 16))
+PRIORITY_QUEUE_BUDGET = float(os.environ.get('PRIORITY_QUEUE_BUDGET', 5.0))  # seconds
+
+admission = AdmissionController([
+    Lane('write', WRITE_CONCURRENCY, WRITE_QUEUE_BUDGET),
+    Lane('priority', PRIORITY_CONCURRENCY, PRIORITY_QUEUE_BUDGET)
+])
+
+def admission_control(lane_name):
+    lane = admission[lane_name]
+
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            admitted, retry_after = lane.acquire()
+            if not admitted:
+                logger.warning(f"Load shed on {lane_name} lane: {request.method} {request.path}")
+                response = jsonify({'success': False, 'error': 'Server busy, please retry shortly'})
+                response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+                return response, 503
+            started = time.time()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                lane.release(time.time() - started)
+        return decorated_function
+    return decorator
+
+# Traffic capture for replay load tests (off by default)
+TRAFFIC_CAPTURE = os.environ.get('TRAFFIC_CAPTURE', 'False').lower() == 'true'
+TRAFFIC_CAPTURE_FILE = os.environ.get(
+    'TRAFFIC_CAPTURE_FILE',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'requests.jsonl'))
+TRAFFIC_CAPTURE_SAMPLE_RATE = float(os.environ.get('TRAFFIC_CAPTURE_SAMPLE_RATE', 1.0))
+traffic_capture = TrafficCapture(TRAFFIC_CAPTURE_FILE, TRAFFIC_CAPTURE_SAMPLE_RATE) if TRAFFIC_CAPTURE else None
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.time()
+
 # Login required decorator
 def login_required(f):
     @wraps(f)
@@ -82,6 +142,13 @@ TOPPING_PRICES = {
 
 BASE_PRICE = 25.00
 
+def pricing_payload():
+    return {'basePrice': BASE_PRICE, 'toppings': TOPPING_PRICES}
+
+# Prices and the orderable toppings only change with a deploy, so their versions are fixed per process
+PRICING_VERSION = fingerprint(pricing_payload())[:16]
+CATALOG_VERSION = fingerprint(sorted(TOPPING_PRICES))[:16]
+
 def calculate_order_price(quantity, topping='none'):
     """Calculate total order price"""
     unit_price = BASE_PRICE + TOPPING_PRICES.get(topping, 0)
@@ -165,9 +232,14 @@ def validate_review_input(review):
     return True, None
 
 # Data file paths
-DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+DATA_DIR = os.environ.get('DATA_DIR', os.path.join(os.path.dirname(__file__), 'data'))
 ORDERS_FILE = os.path.join(DATA_DIR, 'orders.json')
 REVIEWS_FILE = os.path.join(DATA_DIR, 'reviews.json')
+ARCHIVE_DIR = os.path.join(DATA_DIR, 'archive')
+IDEMPOTENCY_FILE = os.path.join(DATA_DIR, 'idempotency.json')
+ORDER_KEYS_FILE = os.path.join(DATA_DIR, 'order_keys.json')
+CHANGELOG_FILE = os.path.join(DATA_DIR, 'changelog.jsonl')
+REPLICA_STATE_FILE = os.path.join(DATA_DIR, 'replica_state.json')
 
 # Ensure data directory exists
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -190,8 +262,153 @@ def read_orders():
         return []
 
 def write_orders(orders):
-    with open(ORDERS_FILE, 'w') as f:
-        json.dump(orders, f, indent=2)
+    write_json_atomic(ORDERS_FILE, orders, indent=2)
+
+# Held around every read-modify-write so concurrent workers never drop each other's orders
+def orders_lock():
+    return FileLock(f"{ORDERS_FILE}.lock")
+
+# Tiered storage: orders older than ORDER_ARCHIVE_DAYS move into compressed monthly segments
+ORDER_ARCHIVE_DAYS = int(os.environ.get('ORDER_ARCHIVE_DAYS', 90))
+ARCHIVE_CHECK_INTERVAL = 3600  # seconds between archive passes per worker
+order_archive = OrderArchive(ARCHIVE_DIR)
+last_archive_check = 0
+
+def archive_old_orders():
+    """Move expired orders from the hot file into archive segments"""
+    global last_archive_check
+    last_archive_check = time.time()
+    # Only whole months are archived, so each month becomes one segment instead of one per pass
+    cutoff = (datetime.now() - timedelta(days=ORDER_ARCHIVE_DAYS)).replace(
+        day=1, hour=0, minute=0, second=0, microsecond=0)
+    with order_archive.lock(), orders_lock():
+        hot, expired = order_archive.split_expired(read_orders(), cutoff)
+        if not expired:
+            return 0
+        # Segments and index are written before the hot file shrinks, so a crash never loses orders
+        order_archive.append(expired)
+        write_orders(hot)
+    logger.info(f"Archived {len(expired)} orders created before {cutoff.date().isoformat()}")
+    return len(expired)
+
+def maybe_archive_orders():
+    if time.time() - last_archive_check >= ARCHIVE_CHECK_INTERVAL:
+        try:
+            archive_old_orders()
+        except Exception as e:
+            logger.error(f"Error archiving orders: {str(e)}")
+
+def parse_date_param(name, end=False):
+    """Parse an optional YYYY-MM-DD (or ISO datetime) query parameter.
+
+    With ``end`` a bare date is inclusive: it becomes midnight of the next day,
+    for use as the exclusive end of a range.
+    """
+    value = request.args.get(name)
+    if not value:
+        return None
+    parsed = naive_local(datetime.fromisoformat(value))
+    if end and len(value) == len('YYYY-MM-DD'):
+        parsed += timedelta(days=1)
+    return parsed
+
+def query_orders(start=None, end=None, include_archive=False):
+    """Orders created within [start, end).
+
+    Without a range only the hot store is read; with a range (or
+    ``include_archive``) the overlapping archive segments are read as well.
+    """
+    orders = read_orders()
+    if start is None and end is None and not include_archive:
+        return orders
+    if start is not None or end is not None:
+        def in_range(order):
+            created = parse_created_at(order)
+            if created is None:
+                return False
+            return (start is None or created >= start) and (end is None or created < end)
+        orders = [order for order in orders if in_range(order)]
+    archived = list(order_archive.query(start, end))
+    return archived + orders
+
+# Analytics rollups: rebuilt from the order files when they change under us, caught up
+# from the new tail when another worker only appended, otherwise updated on each insert
+analytics_state = {'source': None, 'rollups': None, 'archive_source': None, 'archive_rollups': None,
+                   'hot_seen': None}
+
+def order_sources_version():
+    return (file_version(ORDERS_FILE), file_version(order_archive.index_file))
+
+def hot_orders_seen(orders):
+    """(count, last id) of the hot orders the rollups cover, to recognise a pure append later"""
+    return (len(orders), orders[-1].get('id') if orders else None)
+
+def refresh_order_rollups():
+    """Current rollups, rebuilding the hot (and if needed archived) part when stale"""
+    archive_version = file_version(order_archive.index_file)
+    if analytics_state['archive_rollups'] is None or analytics_state['archive_source'] != archive_version:
+        # Archive segments are immutable, so this only reruns after an archive pass or a clear
+        analytics_state['archive_rollups'] = OrderRollups.build([order_archive.query()])
+        analytics_state['archive_source'] = archive_version
+        analytics_state['rollups'] = None
+    version = order_sources_version()
+    if analytics_state['rollups'] is None or analytics_state['source'] != version:
+        orders = read_orders()
+        seen = analytics_state['hot_seen']
+        count = seen[0] if seen else 0
+        if (analytics_state['rollups'] is not None and seen and count <= len(orders)
+                and (count == 0 or orders[count - 1].get('id') == seen[1])):
+            # Orders are only ever appended between archive passes and clears (which change the archive)
+            for order in orders[count:]:
+                analytics_state['rollups'].add(order)
+        else:
+            hot_rollups = OrderRollups.build([orders])
+            analytics_state['rollups'] = analytics_state['archive_rollups'].merged(hot_rollups)
+        analytics_state['hot_seen'] = hot_orders_seen(orders)
+        analytics_state['source'] = version
+    return analytics_state['rollups']
+
+def record_order_inserts(orders, version_before, all_orders):
+    """Fold newly written orders into the rollups if they were current before the write"""
+    if analytics_state['rollups'] is None or analytics_state['source'] != version_before:
+        return
+    for order in orders:
+        analytics_state['rollups'].add(order)
+    analytics_state['hot_seen'] = hot_orders_seen(all_orders)
+    analytics_state['source'] = order_sources_version()
+
+# Idempotency-Key responses for POST /api/orders, shared by workers through IDEMPOTENCY_FILE
+IDEMPOTENCY_TTL = 24 * 3600  # seconds
+IDEMPOTENCY_MAX_KEYS = 1000
+ORDER_FINGERPRINT_FIELDS = ('fullName', 'phoneNumber', 'facebook', 'pickupDate', 'topping', 'quantity')
+idempotency_cache = IdempotencyCache(IDEMPOTENCY_FILE, IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_KEYS)
+# Key -> order id for keyed orders, kept a little longer than the order form holds queued orders (30 days)
+ORDER_KEY_TTL = 31 * 24 * 3600  # seconds
+order_keys = OrderKeyIndex(ORDER_KEYS_FILE, ORDER_KEY_TTL)
+
+# Bundles of orders queued offline by the order form (POST /api/orders/bulk)
+BULK_MAX_ORDERS = int(os.environ.get('BULK_MAX_ORDERS', 50))
+# Content-Encoding -> zlib wbits for compressed request bodies
+BODY_DECODERS = {'gzip': 16 + zlib.MAX_WBITS, 'deflate': zlib.MAX_WBITS}
+
+def decoded_request_body():
+    """Request body inflated per Content-Encoding; raises ValueError if unsupported or too large"""
+    data = request.get_data(cache=True)
+    encoding = request.headers.get('Content-Encoding', 'identity').strip().lower()
+    if encoding == 'identity':
+        return data
+    if encoding not in BODY_DECODERS:
+        raise ValueError(f"Unsupported Content-Encoding: {encoding}")
+    # Same cap as MAX_CONTENT_LENGTH, applied after inflating so a small upload cannot expand without bound
+    limit = app.config['MAX_CONTENT_LENGTH']
+    inflater = zlib.decompressobj(BODY_DECODERS[encoding])
+    try:
+        body = inflater.decompress(data, limit + 1)
+    except zlib.error:
+        raise ValueError('Malformed compressed body')
+    if len(body) > limit:
+        raise ValueError('Request body too large')
+    return body
 
 def read_reviews():
     try:
@@ -201,8 +418,138 @@ def read_reviews():
         return []
 
 def write_reviews(reviews):
-    with open(REVIEWS_FILE, 'w') as f:
-        json.dump(reviews, f, indent=2)
+    write_json_atomic(REVIEWS_FILE, reviews, indent=2)
+
+def reviews_lock():
+    return FileLock(f"{REVIEWS_FILE}.lock")
+
+def reviews_content_version(reviews):
+    """Count plus newest review id: the same on every replica holding the same reviews"""
+    newest = reviews[0].get('id', 0) if reviews else 0
+    return f"{len(reviews)}-{newest}"
+
+# (file version, content version) of the last reviews.json seen, so /api/versions rarely re-reads it
+reviews_version_cache = {'file': None, 'version': '0-0'}
+
+def reviews_version():
+    version = file_version(REVIEWS_FILE)
+    if version is None or version != reviews_version_cache['file']:
+        reviews_version_cache['version'] = reviews_content_version(read_reviews())
+        reviews_version_cache['file'] = version
+    return reviews_version_cache['version']
+
+# Replication: 'standalone' (default), 'primary' (logs every write and serves the change log)
+# or 'follower' (tails the primary, serves reads locally and forwards writes)
+REPLICATION_ROLE = os.environ.get('REPLICATION_ROLE', 'standalone').lower()
+REPLICATION_TOKEN = os.environ.get('REPLICATION_TOKEN', '')
+PRIMARY_URL = os.environ.get('PRIMARY_URL', '')
+REPLICATION_POLL_INTERVAL = float(os.environ.get('REPLICATION_POLL_INTERVAL', 1.0))  # seconds
+REPLICATION_BATCH_LIMIT = 5000
+
+if REPLICATION_ROLE not in ('standalone', 'primary', 'follower'):
+    raise RuntimeError(f"Unknown REPLICATION_ROLE: {REPLICATION_ROLE}")
+if REPLICATION_ROLE != 'standalone' and not REPLICATION_TOKEN:
+    raise RuntimeError('REPLICATION_TOKEN is required for primary and follower nodes')
+if REPLICATION_ROLE == 'follower' and not PRIMARY_URL:
+    raise RuntimeError('PRIMARY_URL is required for follower nodes')
+
+change_log = ChangeLog(CHANGELOG_FILE) if REPLICATION_ROLE == 'primary' else None
+replica_state = ReplicaState(REPLICA_STATE_FILE) if REPLICATION_ROLE == 'follower' else None
+
+def log_change(store, op, record=None):
+    """Record a write for followers; call while holding the store's lock so seq order matches file order"""
+    if change_log is not None:
+        seq = change_log.append(store, op, record)
+        if op == 'clear':
+            # Cleared records must not live on in the log
+            change_log.compact(store, seq)
+
+def has_replication_token():
+    auth = request.headers.get('Authorization', '')
+    return bool(REPLICATION_TOKEN) and auth.startswith('Bearer ') and hmac.compare_digest(
+        auth[len('Bearer '):].encode('utf-8'), REPLICATION_TOKEN.encode('utf-8'))
+
+def client_ip():
+    """Remote address, or the original client's address on writes forwarded by a follower"""
+    forwarded = request.headers.get('X-Forwarded-For')
+    if forwarded and has_replication_token():
+        return forwarded.split(',')[0].strip()
+    return request.remote_addr
+
+def replication_auth_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if REPLICATION_ROLE != 'primary':
+            return jsonify({'success': False, 'error': 'Not found'}), 404
+        if not has_replication_token():
+            logger.warning(f"Unauthorized replication request: {request.remote_addr}")
+            return jsonify({'success': False, 'error': 'Unauthorized'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+def apply_replicated_snapshot(snapshot):
+    """Replace the local stores with the primary's snapshot"""
+    with order_archive.lock(), orders_lock(), reviews_lock():
+        order_archive.clear()
+        write_orders(snapshot['orders'])
+        write_reviews(snapshot['reviews'])
+    # Old orders in the snapshot are archived locally, same as on the primary
+    archive_old_orders()
+
+def apply_replicated_changes(changes):
+    """Apply a batch from the primary's change log in sequence order.
+
+    Inserts whose id is already stored are skipped, so re-applying a batch (after a crash
+    before appliedSeq was saved) cannot duplicate orders or reviews.
+    """
+    with order_archive.lock(), orders_lock(), reviews_lock():
+        orders, reviews = read_orders(), read_reviews()
+        order_ids = {order.get('id') for order in orders}
+        review_ids = {review.get('id') for review in reviews}
+        # A re-applied insert may already have been moved to the archive since it was first applied
+        archived_max_id = max((entry['maxId'] for entry in order_archive.read_index()
+                               if entry.get('maxId') is not None), default=None)
+        orders_changed = reviews_changed = False
+        for change in changes:
+            record = change.get('record') or {}
+            if change['store'] == 'orders':
+                if change['op'] == 'insert':
+                    if record.get('id') in order_ids or (
+                            archived_max_id is not None and isinstance(record.get('id'), int)
+                            and record['id'] <= archived_max_id):
+                        continue
+                    orders.append(record)
+                    order_ids.add(record.get('id'))
+                elif change['op'] == 'clear':
+                    orders, order_ids, archived_max_id = [], set(), None
+                    order_archive.clear()
+                orders_changed = True
+            elif change['store'] == 'reviews':
+                if change['op'] == 'insert':
+                    if record.get('id') in review_ids:
+                        continue
+                    reviews.insert(0, record)
+                    review_ids.add(record.get('id'))
+                elif change['op'] == 'clear':
+                    reviews, review_ids = [], set()
+                reviews_changed = True
+        if orders_changed:
+            write_orders(orders)
+        if reviews_changed:
+            write_reviews(reviews)
+    maybe_archive_orders()
+
+follower = None
+if REPLICATION_ROLE == 'follower':
+    follower = Follower(PRIMARY_URL, REPLICATION_TOKEN, replica_state, REPLICATION_POLL_INTERVAL,
+                        apply_replicated_snapshot, apply_replicated_changes, logger)
+    follower.start()
+
+# Build the rollups at startup so the first dashboard request does not pay for it
+try:
+    refresh_order_rollups()
+except Exception as e:
+    logger.error(f"Error building order rollups: {str(e)}")
 
 # API Endpoints
 
@@ -210,7 +557,7 @@ def write_reviews(reviews):
 def index():
     # Serve the main frontend page
     try:
-        return send_from_directory('.', 'index.html')
+        return send_from_directory(os.getcwd(), 'index.html')
     except Exception:
         return jsonify({'message': 'GleeJeYly API Server (Python)', 'version': '1.0.0'})
 
@@ -224,22 +571,62 @@ def serve_static(filename):
 
     fullpath = os.path.join(os.getcwd(), filename)
     if os.path.exists(fullpath):
-        return send_from_directory('.', filename)
+        return send_from_directory(os.getcwd(), filename)
     return jsonify({'success': False, 'error': 'Not found'}), 404
 
+# Not behind admission control: a load balancer must not pull the node out during a spike
 @app.route('/api/health', methods=['GET'])
 def health():
     return jsonify({
         'status': 'ok',
-        'message': 'GleeJeYly API is running'
+        'message': 'GleeJeYly API is running',
+        'admission': admission.stats(),
+        'capture': traffic_capture.stats() if traffic_capture else None
     })
 
 @app.route('/api/orders', methods=['GET'])
 def get_orders():
-    orders = read_orders()
+    try:
+        start, end = parse_date_param('from'), parse_date_param('to', end=True)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date range'}), 400
+    orders = query_orders(start, end)
     return jsonify(orders)
 
+def save_orders(new_orders):
+    """Assign IDs and timestamps, append to the hot store in one write and return a response body per order"""
+    maybe_archive_orders()
+    with orders_lock():
+        orders = read_orders()
+        last_id = orders[-1].get('id', 0) if orders else 0
+        
+        for order in new_orders:
+            # Add ID and timestamp; IDs stay unique when several orders land in the same millisecond
+            order['id'] = max(int(datetime.now().timestamp() * 1000), last_id + 1)
+            order['createdAt'] = datetime.now().isoformat()
+            last_id = order['id']
+            orders.append(order)
+        
+        version_before = order_sources_version()
+        write_orders(orders)
+        for order in new_orders:
+            log_change('orders', 'insert', order)
+        record_order_inserts(new_orders, version_before, orders)
+    
+    for order in new_orders:
+        logger.info(f"Order created: {order['id']}")
+    # Return the created order so clients can read id and server-calculated totals
+    return [{
+        'success': True,
+        'message': 'Order created successfully',
+        'order': order
+    } for order in new_orders]
+
+def save_order(order):
+    return save_orders([order])[0]
+
 @app.route('/api/orders', methods=['POST'])
+@admission_control('write')
 @rate_limit
 def create_order():
     try:
@@ -253,32 +640,151 @@ def create_order():
             logger.warning(f"Invalid order input: {error_msg}")
             return jsonify({'success': False, 'error': error_msg}), 400
         
-        orders = read_orders()
+        idempotency_key = request.headers.get('Idempotency-Key')
+        if idempotency_key is None:
+            return jsonify(save_order(order)), 201
+        if not valid_key(idempotency_key):
+            return jsonify({'success': False, 'error': 'Invalid Idempotency-Key'}), 400
         
-        # Add ID and timestamp
-        order['id'] = int(datetime.now().timestamp() * 1000)
-        order['createdAt'] = datetime.now().isoformat()
+        request_fingerprint = fingerprint({field: order.get(field) for field in ORDER_FINGERPRINT_FIELDS})
+        # Fast path: a replay already cached in this worker never touches the data files
+        cached = idempotency_cache.get(idempotency_key)
+        if cached is None:
+            with idempotency_cache.lock():
+                cached = idempotency_cache.get(idempotency_key)
+                if cached is None:
+                    body = save_order(order)
+                    idempotency_cache.put(idempotency_key, request_fingerprint, 201, body)
+                    order_keys.add_many([(idempotency_key, order['id'], request_fingerprint)])
+                    return jsonify(body), 201
         
-        orders.append(order)
-        write_orders(orders)
-        
-        logger.info(f"Order created: {order['id']}")
-        # Return the created order so clients can read id and server-calculated totals
-        return jsonify({
-            'success': True,
-            'message': 'Order created successfully',
-            'order': order
-        }), 201
+        if cached['fingerprint'] != request_fingerprint:
+            logger.warning(f"Idempotency-Key reused with a different order: {idempotency_key}")
+            return jsonify({'success': False, 'error': 'Idempotency-Key already used for a different order'}), 422
+        logger.info(f"Order replayed for Idempotency-Key: {idempotency_key}")
+        response = jsonify(cached['body'])
+        response.headers['Idempotent-Replayed'] = 'true'
+        return response, cached['status']
     except Exception as e:
         logger.error(f"Error creating order: {str(e)}")
         return jsonify({'success': False, 'error': 'Failed to process order'}), 400
 
+def bulk_error(key, status, error):
+    return {'key': key, 'status': status, 'success': False, 'error': error}
+
+def bulk_replay(key, request_fingerprint, cached):
+    if cached['fingerprint'] != request_fingerprint:
+        return bulk_error(key, 422, 'Idempotency-Key already used for a different order')
+    return dict(cached['body'], key=key, status=cached['status'], replayed=True)
+
+def ingest_order_bundle(entries):
+    """Validate, dedupe and store {key, order} entries in bundle order; returns one result per entry"""
+    results = [None] * len(entries)
+    accepted = []
+    for index, entry in enumerate(entries):
+        key = entry.get('key') if isinstance(entry, dict) else None
+        if not isinstance(key, str) or not valid_key(key):
+            results[index] = bulk_error(key, 400, 'Missing or invalid key')
+            continue
+        order = entry.get('order')
+        is_valid, error_msg = validate_order_input(order)
+        if not is_valid:
+            logger.warning(f"Invalid bulk order input: {error_msg}")
+            results[index] = bulk_error(key, 400, error_msg)
+            continue
+        request_fingerprint = fingerprint({field: order.get(field) for field in ORDER_FINGERPRINT_FIELDS})
+        accepted.append((index, key, request_fingerprint, order))
+    
+    new, repeats, first_seen = [], [], {}
+    with idempotency_cache.lock():
+        for index, key, request_fingerprint, order in accepted:
+            if key in first_seen:
+                # Same key twice in one bundle: answered like a retry of the first one
+                repeats.append((index, key, request_fingerprint, first_seen[key]))
+                continue
+            first_seen[key] = index
+            cached = idempotency_cache.get(key)
+            if cached is None:
+                new.append((index, key, request_fingerprint, order))
+            else:
+                results[index] = bulk_replay(key, request_fingerprint, cached)
+        
+        if new:
+            # Queued orders can outlive the cache (24h, 1000 keys), e.g. one queued after a timed-out
+            # POST that was in fact stored; the longer-lived key index catches those
+            indexed = order_keys.lookup([key for _, key, _, _ in new])
+            hot = {order.get('id'): order for order in read_orders()} if indexed else {}
+            unseen = []
+            for index, key, request_fingerprint, order in new:
+                order_id, stored_fingerprint = indexed.get(key, (None, None))
+                if order_id is None or order_id not in hot:
+                    unseen.append((index, key, request_fingerprint, order))
+                    continue
+                results[index] = bulk_replay(key, request_fingerprint, {
+                    'fingerprint': stored_fingerprint,
+                    'status': 201,
+                    'body': {'success': True, 'message': 'Order created successfully', 'order': hot[order_id]}
+                })
+            new = unseen
+        
+        if new:
+            bodies = save_orders([order for _, _, _, order in new])
+            idempotency_cache.put_many([(key, request_fingerprint, 201, body)
+                                        for (_, key, request_fingerprint, _), body in zip(new, bodies)])
+            order_keys.add_many([(key, order['id'], request_fingerprint) for _, key, request_fingerprint, order in new])
+            for (index, key, _, _), body in zip(new, bodies):
+                results[index] = dict(body, key=key, status=201)
+    
+    fingerprints = {index: request_fingerprint for index, _, request_fingerprint, _ in accepted}
+    for index, key, request_fingerprint, first in repeats:
+        if request_fingerprint != fingerprints[first]:
+            results[index] = bulk_error(key, 422, 'Idempotency-Key already used for a different order')
+        elif results[first]['success']:
+            results[index] = dict(results[first], replayed=True)
+        else:
+            results[index] = dict(results[first], key=key)
+    return results
+
+@app.route('/api/orders/bulk', methods=['POST'])
+@admission_control('write')
+@rate_limit
+def create_orders_bulk():
+    """Submit a bundle of orders queued offline, optionally gzip-compressed"""
+    try:
+        bundle = json.loads(decoded_request_body() or b'null')
+    except ValueError as e:
+        return jsonify({'success': False, 'error': f"Invalid request body: {str(e)}"}), 400
+    
+    entries = bundle.get('orders') if isinstance(bundle, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'success': False, 'error': 'Expected a non-empty "orders" list'}), 400
+    if len(entries) > BULK_MAX_ORDERS:
+        return jsonify({'success': False, 'error': f"At most {BULK_MAX_ORDERS} orders per bundle"}), 413
+    
+    try:
+        results = ingest_order_bundle(entries)
+    except Exception as e:
+        logger.error(f"Error creating bulk orders: {str(e)}")
+        return jsonify({'success': False, 'error': 'Failed to process orders'}), 400
+    
+    logger.info(f"Bulk order bundle: {len(entries)} entries")
+    return jsonify({
+        'success': True,
+        'created': sum(1 for r in results if r['status'] == 201 and not r.get('replayed')),
+        'replayed': sum(1 for r in results if r.get('replayed')),
+        'failed': sum(1 for r in results if not r['success']),
+        'results': results
+    }), 200
+
 @app.route('/api/reviews', methods=['GET'])
 def get_reviews():
     reviews = read_reviews()
-    return jsonify(reviews)
+    response = jsonify(reviews)
+    response.headers['X-Data-Version'] = reviews_content_version(reviews)
+    return response
 
 @app.route('/api/reviews', methods=['POST'])
+@admission_control('write')
 @rate_limit
 def create_review():
     try:
@@ -292,14 +798,16 @@ def create_review():
             logger.warning(f"Invalid review input: {error_msg}")
             return jsonify({'success': False, 'error': error_msg}), 400
         
-        reviews = read_reviews()
-        
-        # Add ID and timestamp
-        review['id'] = int(datetime.now().timestamp() * 1000)
-        review['date'] = datetime.now().strftime('%m/%d/%Y')
-        
-        reviews.insert(0, review)  # Add to front
-        write_reviews(reviews)
+        with reviews_lock():
+            reviews = read_reviews()
+            
+            # Add ID and timestamp
+            review['id'] = int(datetime.now().timestamp() * 1000)
+            review['date'] = datetime.now().strftime('%m/%d/%Y')
+            
+            reviews.insert(0, review)  # Add to front
+            write_reviews(reviews)
+            log_change('reviews', 'insert', review)
         
         logger.info(f"Review created: {review['id']}")
         return jsonify({
@@ -313,14 +821,27 @@ def create_review():
 # ===== PRICING ENDPOINTS =====
 
 @app.route('/api/pricing', methods=['GET'])
+@admission_control('priority')
 def get_pricing():
     """Get pricing information for toppings"""
-    return jsonify({
-        'basePrice': BASE_PRICE,
-        'toppings': TOPPING_PRICES
-    }), 200
+    response = jsonify(pricing_payload())
+    response.headers['X-Data-Version'] = PRICING_VERSION
+    return response, 200
+
+@app.route('/api/versions', methods=['GET'])
+@admission_control('priority')
+def get_versions():
+    """Current data versions, so cached API responses are only refetched when they changed"""
+    response = jsonify({
+        'reviews': reviews_version(),
+        'pricing': PRICING_VERSION,
+        'catalog': CATALOG_VERSION
+    })
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/calculate-price', methods=['POST'])
+@admission_control('priority')
 @rate_limit
 def calculate_price():
     """Calculate order total price"""
@@ -431,6 +952,7 @@ def internal_error(e):
 
 @app.route('/dashboard')
 @login_required
+@admission_control('priority')
 def dashboard():
     """Serve dashboard HTML"""
     return '''
@@ -671,17 +1193,19 @@ def dashboard():
             
             async function loadDashboardData() {
                 try {
-                    const [ordersRes, reviewsRes] = await Promise.all([
+                    const [ordersRes, reviewsRes, archiveRes] = await Promise.all([
                         fetch(API_BASE + '/dashboard/orders'),
-                        fetch(API_BASE + '/dashboard/reviews')
+                        fetch(API_BASE + '/dashboard/reviews'),
+                        fetch(API_BASE + '/dashboard/archive')
                     ]);
                     
                     const orders = await ordersRes.json();
                     const reviews = await reviewsRes.json();
+                    const archive = await archiveRes.json();
                     
                     displayOrders(orders);
                     displayReviews(reviews);
-                    updateStats(orders, reviews);
+                    updateStats(orders, reviews, archive);
                 } catch (error) {
                     console.error('Error loading dashboard:', error);
                     document.getElementById('ordersContainer').innerHTML = '<div class="empty">Error loading orders</div>';
@@ -743,11 +1267,12 @@ def dashboard():
                 container.innerHTML = html;
             }
             
-            function updateStats(orders, reviews) {
-                document.getElementById('orderCount').textContent = orders.length;
+            function updateStats(orders, reviews, archive) {
+                // Archived orders are counted from the segment index, not downloaded
+                document.getElementById('orderCount').textContent = orders.length + (archive.count || 0);
                 document.getElementById('reviewCount').textContent = reviews.length;
                 
-                const totalRevenue = orders.reduce((sum, o) => sum + ((o.totalPrice != null) ? o.totalPrice : (o.total || 0)), 0);
+                const totalRevenue = orders.reduce((sum, o) => sum + ((o.totalPrice != null) ? o.totalPrice : (o.total || 0)), archive.revenue || 0);
                 document.getElementById('totalRevenue').textContent = '₱' + totalRevenue.toFixed(2);
                 
                 if (reviews.length > 0) {
@@ -757,7 +1282,7 @@ def dashboard():
             }
             
             function exportOrders() {
-                fetch(API_BASE + '/dashboard/orders')
+                fetch(API_BASE + '/dashboard/orders?archived=1')
                     .then(r => r.json())
                     .then(data => downloadJSON(data, 'orders.json'));
             }
@@ -805,19 +1330,62 @@ def dashboard():
 
 @app.route('/api/dashboard/orders', methods=['GET', 'DELETE'])
 @login_required
+@admission_control('priority')
 @rate_limit
 def dashboard_orders():
-    """Get all orders or delete all orders"""
+    """Get orders (hot store, a date range, or everything) or delete all orders"""
     if request.method == 'GET':
-        orders = read_orders()
+        try:
+            start, end = parse_date_param('from'), parse_date_param('to', end=True)
+        except ValueError:
+            return jsonify({'success': False, 'error': 'Invalid date range'}), 400
+        include_archive = request.args.get('archived') == '1'
+        orders = query_orders(start, end, include_archive)
         return jsonify(orders)
     elif request.method == 'DELETE':
-        write_orders([])
+        # Same lock order as create_order: idempotency, then archive, then orders
+        with idempotency_cache.lock(), order_archive.lock(), orders_lock():
+            write_orders([])
+            order_archive.clear()
+            log_change('orders', 'clear')
+            idempotency_cache.clear()
+            order_keys.clear()
         logger.info("All orders cleared")
         return jsonify({'success': True, 'message': 'All orders deleted'})
 
+@app.route('/api/dashboard/archive', methods=['GET'])
+@login_required
+@admission_control('priority')
+@rate_limit
+def dashboard_archive():
+    """Summary of archived orders, served from the segment index"""
+    return jsonify(order_archive.summary())
+
+@app.route('/api/dashboard/analytics', methods=['GET'])
+@login_required
+@admission_control('priority')
+@rate_limit
+def dashboard_analytics():
+    """Order volume and revenue per day/week/month, optionally split by topping"""
+    bucket = request.args.get('bucket', 'day')
+    group_by = request.args.get('groupBy', 'none')
+    date_field = request.args.get('date', 'created')
+    if bucket not in BUCKETS or group_by not in GROUP_BYS or date_field not in DATE_FIELDS:
+        return jsonify({'success': False, 'error': 'Invalid analytics parameters'}), 400
+    try:
+        start, end = parse_date_param('from'), parse_date_param('to', end=True)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid date range'}), 400
+    rollups = refresh_order_rollups()
+    try:
+        return jsonify(rollups.series(bucket, group_by, date_field,
+                                      start.date() if start else None, end.date() if end else None))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
 @app.route('/api/dashboard/reviews', methods=['GET', 'DELETE'])
 @login_required
+@admission_control('priority')
 @rate_limit
 def dashboard_reviews():
     """Get all reviews or delete all reviews"""
@@ -825,10 +1393,102 @@ def dashboard_reviews():
         reviews = read_reviews()
         return jsonify(reviews)
     elif request.method == 'DELETE':
-        write_reviews([])
+        with reviews_lock():
+            write_reviews([])
+            log_change('reviews', 'clear')
         logger.info("All reviews cleared")
         return jsonify({'success': True, 'message': 'All reviews deleted'})
 
+# ===== REPLICATION ENDPOINTS =====
+
+@app.route('/api/replication/changes', methods=['GET'])
+@replication_auth_required
+def replication_changes():
+    """Change log entries after ?since=<seq>, for followers"""
+    try:
+        since = int(request.args.get('since', 0))
+        limit = min(int(request.args.get('limit', 1000)), REPLICATION_BATCH_LIMIT)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid since/limit'}), 400
+    changes = change_log.read_since(since, limit)
+    last_seq, last_ts = change_log.last()
+    return jsonify({'changes': changes, 'lastSeq': last_seq, 'lastTs': last_ts})
+
+@app.route('/api/replication/snapshot', methods=['GET'])
+@replication_auth_required
+def replication_snapshot():
+    """Full copy of both stores and the change log position it corresponds to"""
+    # No change can be logged while both store locks are held
+    with orders_lock(), reviews_lock():
+        seq, ts = change_log.last()
+        orders = query_orders(include_archive=True)
+        reviews = read_reviews()
+    return jsonify({'seq': seq, 'ts': ts, 'orders': orders, 'reviews': reviews})
+
+@app.route('/api/replication/status', methods=['GET'])
+def replication_status():
+    """Role of this node; followers also report how far behind the primary they are"""
+    status = {'role': REPLICATION_ROLE}
+    if change_log is not None:
+        last_seq, last_ts = change_log.last()
+        status.update(lastSeq=last_seq, lastTs=last_ts)
+    if replica_state is not None:
+        status.update(replica_state.status())
+    return jsonify(status)
+
+# Calculating a price writes nothing, so followers answer it themselves
+FOLLOWER_LOCAL_POST_PATHS = ('/api/calculate-price',)
+FORWARDED_HEADERS = ('Content-Type', 'Content-Encoding', 'Idempotency-Key', 'Cookie')
+
+@app.before_request
+def forward_writes_to_primary():
+    if REPLICATION_ROLE != 'follower' or request.method in ('GET', 'HEAD', 'OPTIONS'):
+        return None
+    if not request.path.startswith('/api/') or request.path in FOLLOWER_LOCAL_POST_PATHS:
+        return None
+
+    headers = {'Authorization': f"Bearer {REPLICATION_TOKEN}", 'X-Forwarded-For': request.remote_addr or ''}
+    for name in FORWARDED_HEADERS:
+        if name in request.headers:
+            headers[name] = request.headers[name]
+    path = request.full_path if request.query_string else request.path
+    forwarded = urllib.request.Request(f"{PRIMARY_URL.rstrip('/')}{path}", data=request.get_data(),
+                                       method=request.method, headers=headers)
+    try:
+        with urllib.request.urlopen(forwarded, timeout=30) as resp:
+            status, body, resp_headers = resp.status, resp.read(), resp.headers
+    except urllib.error.HTTPError as e:
+        status, body, resp_headers = e.code, e.read(), e.headers
+    except (urllib.error.URLError, OSError) as e:
+        logger.error(f"Forwarding {request.method} {request.path} to primary failed: {str(e)}")
+        response = jsonify({'success': False, 'error': 'Primary unavailable, please retry shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+
+    # Pull the new change right away so the write shows up here quickly
+    follower.wake()
+    response = app.response_class(body, status=status, content_type=resp_headers.get('Content-Type'))
+    for name in ('Retry-After', 'Idempotent-Replayed'):
+        if name in resp_headers:
+            response.headers[name] = resp_headers[name]
+    return response
+
+@app.after_request
+def capture_traffic(response):
+    if traffic_capture is None or not request.path.startswith('/api/') or not traffic_capture.should_sample():
+        return response
+    started = g.get('request_started', time.time())
+    path = request.full_path if request.query_string else request.path
+    body = None
+    if request.method in ('POST', 'PUT', 'PATCH'):
+        # Parse the raw bytes again: handlers modify the dict returned by get_json()
+        try:
+            body = json.loads(decoded_request_body() or b'null')
+        except ValueError:
+            body = None
+    traffic_capture.record(started, request.method, path, body, response.status_code, time.time() - started)
+    return response
+
 # Security: Set response headers
 @app.after_request
 def set_security_headers(response):
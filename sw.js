@@ -1,4 +1,11 @@
-const CACHE_NAME = 'gle-shell-v1';
+importScripts('/scripts/order-queue.js');
+
+const CACHE_NAME = 'gle-shell-v3';
+const API_CACHE_NAME = 'gle-api-v1';
+// Cached API responses served stale-while-revalidate, keyed to their entry in /api/versions
+const VERSIONED_API_PATHS = { '/api/reviews': 'reviews', '/api/pricing': 'pricing' };
+// One /api/versions answer covers every request made within this window (e.g. one page load)
+const VERSIONS_MAX_AGE = 5000;
 const ASSETS_TO_CACHE = [
   '/',
   '/index.html',
@@ -9,6 +16,8 @@ const ASSETS_TO_CACHE = [
   '/contact.html',
   '/styles/style.css',
   '/scripts/script.js',
+  '/scripts/loader.js',
+  '/scripts/order-queue.js',
   '/images/logo.svg'
 ];
 
@@ -22,14 +31,74 @@ self.addEventListener('install', (event) => {
 self.addEventListener('activate', (event) => {
   event.waitUntil(
     caches.keys().then(keys => Promise.all(
-      keys.filter(k => k !== CACHE_NAME).map(k => caches.delete(k))
+      keys.filter(k => k !== CACHE_NAME && k !== API_CACHE_NAME).map(k => caches.delete(k))
     ))
   );
   self.clients.claim();
 });
 
+let versionsRequest = null;
+let versionsFetchedAt = 0;
+
+function currentVersions() {
+  if (!versionsRequest || Date.now() - versionsFetchedAt > VERSIONS_MAX_AGE) {
+    versionsFetchedAt = Date.now();
+    versionsRequest = fetch('/api/versions', { cache: 'no-store' })
+      .then(resp => resp.ok ? resp.json() : null)
+      .catch(() => null);
+  }
+  return versionsRequest;
+}
+
+function refreshApiCache(request) {
+  return fetch(request).then(resp => {
+    if (!resp.ok) return resp;
+    const copy = resp.clone();
+    return caches.open(API_CACHE_NAME).then(cache => cache.put(request, copy)).then(() => resp);
+  });
+}
+
+function notifyClients(message) {
+  return self.clients.matchAll().then(clients => clients.forEach(client => client.postMessage(message)));
+}
+
+// Refetch a cached response only when the server says its data version moved
+async function revalidate(request, path, cached) {
+  const versions = await currentVersions();
+  if (versions && cached.headers.get('X-Data-Version') === versions[VERSIONED_API_PATHS[path]]) return;
+  try {
+    const resp = await refreshApiCache(request);
+    if (resp.ok) await notifyClients({ type: 'api-updated', path });
+  } catch (e) { /* offline: keep serving the cached copy */ }
+}
+
 self.addEventListener('fetch', (event) => {
   const url = new URL(event.request.url);
+  // Stale-while-revalidate for versioned API reads
+  if (event.request.method === 'GET' && VERSIONED_API_PATHS[url.pathname]) {
+    const cachedResponse = caches.open(API_CACHE_NAME).then(cache => cache.match(event.request));
+    event.respondWith(cachedResponse.then(cached => cached || refreshApiCache(event.request)));
+    event.waitUntil(cachedResponse.then(cached => cached && revalidate(event.request, url.pathname, cached)));
+    return;
+  }
+
+  // A write to a versioned path (e.g. a new review) makes its cached copy stale right away
+  if (event.request.method !== 'GET' && VERSIONED_API_PATHS[url.pathname]) {
+    event.respondWith(fetch(event.request).then(resp => {
+      if (resp.ok) {
+        versionsRequest = null;
+        event.waitUntil(refreshApiCache(new Request(url.pathname))
+          .then(fresh => fresh.ok && notifyClients({ type: 'api-updated', path: url.pathname }))
+          .catch(() => {}));
+      }
+      return resp;
+    }));
+    return;
+  }
+
+  // Other writes go straight to the network; a cached answer means nothing for them
+  if (event.request.method !== 'GET') return;
+
   // Network-first for API paths
   if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/orders') || url.pathname.startsWith('/reviews')) {
     event.respondWith(
@@ -48,3 +117,11 @@ self.addEventListener('fetch', (event) => {
     })).catch(() => caches.match('/'))
   );
 });
+
+// Background Sync: send orders queued while offline as one bundle, then tell open pages how it went
+self.addEventListener('sync', (event) => {
+  if (event.tag !== GleOrderQueue.SYNC_TAG) return;
+  event.waitUntil(GleOrderQueue.flush().then(results => {
+    if (results.length) return notifyClients({ type: 'orders-flushed', results });
+  }));
+});